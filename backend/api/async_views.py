@@ -0,0 +1,251 @@
+import copy
+from contextlib import nullcontext
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.urls import path
+from rest_framework import exceptions, status
+from rest_framework.authentication import get_authorization_header
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.request import Request
+
+from ingridients import search
+from ingridients.models import Ingredient
+from ingridients.serializers import IngredientSerializer
+from recipes import cache, shopping_list
+from recipes.services import get_shopping_cart_ingredients
+from recipes.views import RecipeViewSet
+from tags.models import Tag
+from tags.serializers import TagSerializer
+from . import snapshots
+from .authentication import CachedTokenAuthentication, token_cache
+from .conditional import is_not_modified, patch_conditional
+from .fieldsets import Fieldset
+from .instrumentation import TimedJSONRenderer
+from .replicas import replica_reads
+
+DICTIONARY_CACHE_CONTROL = {
+    'public': True, 'max_age': settings.DICTIONARY_MAX_AGE
+}
+
+
+def render_json(data):
+    return HttpResponse(
+        TimedJSONRenderer().render(data),
+        content_type=TimedJSONRenderer.media_type
+    )
+
+
+def accepts_json(request):
+    return (
+        'format' not in request.GET
+        and 'text/html' not in request.headers.get('Accept', '')
+    )
+
+
+async def authenticate(request):
+    auth = get_authorization_header(request).split()
+    if not auth:
+        return AnonymousUser()
+    if len(auth) != 2 or auth[0].lower() != b'token':
+        return None
+    try:
+        key = auth[1].decode()
+    except UnicodeError:
+        return None
+    cached = await token_cache.aget(key)
+    if cached is not None:
+        return copy.copy(cached[0])
+    try:
+        user, _ = await sync_to_async(
+            CachedTokenAuthentication().authenticate_credentials
+        )(key)
+    except exceptions.AuthenticationFailed:
+        return None
+    return user
+
+
+async def conditional(request, etag, render, cache_control, vary_headers=()):
+    if is_not_modified(request, etag):
+        response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = await render()
+        if response is None:
+            return None
+    return patch_conditional(response, etag, cache_control, vary_headers)
+
+
+async def get_dictionary_etag(request):
+    return await sync_to_async(snapshots.get_etag, thread_sensitive=False)(
+        request.get_full_path()
+    )
+
+
+async def tag_list(request):
+    async def render():
+        tags = [tag async for tag in Tag.objects.all()]
+        return render_json(TagSerializer(tags, many=True).data)
+
+    etag = await get_dictionary_etag(request)
+    return await conditional(request, etag, render, DICTIONARY_CACHE_CONTROL)
+
+
+async def tag_detail(request, pk):
+    async def render():
+        tag = await Tag.objects.filter(pk=pk).afirst()
+        if tag is None:
+            return None
+        return render_json(TagSerializer(tag).data)
+
+    etag = await get_dictionary_etag(request)
+    return await conditional(request, etag, render, DICTIONARY_CACHE_CONTROL)
+
+
+async def ingredient_list(request):
+    async def render():
+        name = request.GET.get('name')
+        if name is None:
+            ingredients = [
+                ingredient async for ingredient in Ingredient.objects.all()
+            ]
+        else:
+            index = await sync_to_async(search.get_index)()
+            ingredients = index.search(name, settings.INGREDIENT_SEARCH_LIMIT)
+        return render_json(
+            IngredientSerializer(ingredients, many=True).data
+        )
+
+    etag = await get_dictionary_etag(request)
+    return await conditional(request, etag, render, DICTIONARY_CACHE_CONTROL)
+
+
+async def ingredient_detail(request, pk):
+    async def render():
+        ingredient = await Ingredient.objects.filter(pk=pk).afirst()
+        if ingredient is None:
+            return None
+        return render_json(IngredientSerializer(ingredient).data)
+
+    etag = await get_dictionary_etag(request)
+    return await conditional(request, etag, render, DICTIONARY_CACHE_CONTROL)
+
+
+def get_list_payload(request):
+    return cache.get_payload(cache.list_key(request))
+
+
+def get_detail_payload(pk):
+    return cache.get_payload(cache.detail_key(pk))
+
+
+async def recipe_list(request):
+    if not cache.is_cacheable(request):
+        return None
+    user = await authenticate(request)
+    if user is None:
+        return None
+    data = await sync_to_async(
+        get_list_payload, thread_sensitive=False
+    )(request)
+    if data is None:
+        return None
+    await cache.aapply_user_flags(data, user)
+    return render_json(data)
+
+
+async def recipe_detail(request, pk):
+    if Fieldset.from_request(request):
+        return None
+    user = await authenticate(request)
+    if user is None:
+        return None
+    data = await sync_to_async(get_detail_payload, thread_sensitive=False)(pk)
+    if data is None:
+        return None
+    state = await cache.detail_state(user, pk).afirst()
+    if state is None:
+        return None
+    etag = await sync_to_async(cache.detail_etag, thread_sensitive=False)(
+        request.get_full_path(), state
+    )
+
+    async def render():
+        (data['is_favorited'], data['is_in_shopping_cart'],
+         data['author']['is_subscribed']) = state[1:]
+        return render_json(data)
+
+    return await conditional(
+        request, etag, render, cache.get_cache_control(user),
+        RecipeViewSet.vary_headers
+    )
+
+
+async def download_shopping_cart(request):
+    user = await authenticate(request)
+    if user is None or user.is_anonymous:
+        return None
+    try:
+        renderer, _ = DefaultContentNegotiation().select_renderer(
+            Request(request),
+            [renderer() for renderer in shopping_list.RENDERERS]
+        )
+    except exceptions.NotAcceptable:
+        return None
+    rows = [row async for row in get_shopping_cart_ingredients(user)]
+    return renderer.attachment(await renderer.astream(rows))
+
+
+def fast_path(handler, fallback, json_only=True, replica=False):
+    async def view(request, *args, **kwargs):
+        response = None
+        if request.method == 'GET' and (
+            accepts_json(request) or not json_only
+        ):
+            with replica_reads() if replica else nullcontext():
+                response = await handler(request, *args, **kwargs)
+        if response is None:
+            response = await sync_to_async(fallback)(
+                request, *args, **kwargs
+            )
+        return response
+
+    view.csrf_exempt = True
+    return view
+
+
+def get_urlpatterns(router):
+    views = {pattern.name: pattern.callback for pattern in router.urls}
+    urlpatterns = [path(
+        'recipes/download_shopping_cart/',
+        fast_path(
+            download_shopping_cart,
+            views['recipes-download-shopping-cart'],
+            json_only=False
+        ),
+        name='recipes-download-shopping-cart'
+    )]
+    for prefix, list_handler, detail_handler, replica in (
+        ('tags', tag_list, tag_detail, True),
+        ('ingredients', ingredient_list, ingredient_detail, True),
+        ('recipes', recipe_list, recipe_detail, False),
+    ):
+        urlpatterns += [
+            path(
+                f'{prefix}/',
+                fast_path(
+                    list_handler, views[f'{prefix}-list'], replica=replica
+                ),
+                name=f'{prefix}-list'
+            ),
+            path(
+                f'{prefix}/<int:pk>/',
+                fast_path(
+                    detail_handler, views[f'{prefix}-detail'],
+                    replica=replica
+                ),
+                name=f'{prefix}-detail'
+            ),
+        ]
+    return urlpatterns
@@ -0,0 +1,100 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.authentication import TokenAuthentication
+
+
+def _shared_cache():
+    if settings.TOKEN_CACHE_BACKEND:
+        return caches[settings.TOKEN_CACHE_BACKEND]
+    return None
+
+
+def _shared_key(key):
+    return 'auth:token:' + hashlib.sha256(key.encode()).hexdigest()
+
+
+class TokenCache:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_local(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.entries.move_to_end(key)
+                return entry[1]
+            self.entries.pop(key, None)
+        return None
+
+    def get(self, key):
+        shared = _shared_cache()
+        if shared is None:
+            return self.counted(self.get_local(key))
+        return self.counted(shared.get(_shared_key(key)))
+
+    async def aget(self, key):
+        shared = _shared_cache()
+        if shared is None:
+            return self.get(key)
+        return self.counted(await shared.aget(_shared_key(key)))
+
+    def counted(self, value):
+        with self.lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value):
+        shared = _shared_cache()
+        if shared is None:
+            self.store(key, value)
+        else:
+            shared.set(
+                _shared_key(key), value, settings.TOKEN_CACHE_TIMEOUT
+            )
+
+    def store(self, key, value):
+        with self.lock:
+            self.entries[key] = (
+                time.monotonic() + settings.TOKEN_CACHE_TIMEOUT, value
+            )
+            self.entries.move_to_end(key)
+            while len(self.entries) > settings.TOKEN_CACHE_SIZE:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, *keys):
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+        shared = _shared_cache()
+        if shared and keys:
+            shared.delete_many([_shared_key(key) for key in keys])
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = 0
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is None:
+            cached = super().authenticate_credentials(key)
+            token_cache.set(key, cached)
+        user, token = cached
+        return copy.copy(user), token
@@ -0,0 +1,50 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def _generation_key(name):
+    return f'generation:{name}'
+
+
+def is_local_cache():
+    return settings.CACHES['default']['BACKEND'] in LOCAL_CACHES
+
+
+def _generation_timeout():
+    # Поколение в памяти процесса не узнает об изменениях в других
+    # воркерах, поэтому живёт ограниченное время: новое значение меняет
+    # ключи кэша и ETag.
+    if is_local_cache():
+        return settings.LOCAL_GENERATION_TIMEOUT
+    return None
+
+
+def _initial_generation():
+    return time.time_ns() // 1000
+
+
+def get_generations(*names):
+    keys = [_generation_key(name) for name in names]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            cache.add(key, _initial_generation(), _generation_timeout())
+            generations[key] = cache.get(key)
+    return [generations[key] for key in keys]
+
+
+def bump_generation(name):
+    key = _generation_key(name)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        generation = _initial_generation()
+        cache.set(key, generation, _generation_timeout())
+        return generation
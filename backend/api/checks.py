@@ -0,0 +1,17 @@
+from django.core import checks
+
+from .cache import is_local_cache
+
+
+@checks.register(checks.Tags.caches, deploy=True)
+def check_shared_generations(app_configs, **kwargs):
+    if not is_local_cache():
+        return []
+    return [checks.Warning(
+        'Поколения кэша хранятся в памяти процесса: другие воркеры узнают '
+        'об изменениях справочников и рецептов только через '
+        'LOCAL_GENERATION_TIMEOUT секунд.',
+        hint='Укажите общий CACHE_BACKEND (например, Redis), если воркеров '
+             'больше одного.',
+        id='api.W001',
+    )]
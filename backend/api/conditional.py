@@ -0,0 +1,51 @@
+import hashlib
+
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def make_etag(*parts):
+    digest = hashlib.sha256(
+        ':'.join(map(str, parts)).encode()
+    ).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def is_not_modified(request, etag):
+    etags = parse_etags(request.headers.get('If-None-Match', ''))
+    return etag in etags or '*' in etags
+
+
+def patch_conditional(response, etag, cache_control, vary_headers=()):
+    if response.status_code in (status.HTTP_200_OK,
+                                status.HTTP_304_NOT_MODIFIED):
+        response['ETag'] = etag
+        patch_cache_control(response, **cache_control)
+        patch_vary_headers(response, vary_headers)
+    return response
+
+
+class ConditionalGetMixin:
+    cache_control = {}
+    vary_headers = ()
+
+    def get_etag(self, request, *args, **kwargs):
+        return None
+
+    def get_cache_control(self, request):
+        return self.cache_control
+
+    def conditional_response(self, view, request, *args, **kwargs):
+        etag = self.get_etag(request, *args, **kwargs)
+        if etag is None:
+            return view(request, *args, **kwargs)
+        if is_not_modified(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = view(request, *args, **kwargs)
+        return patch_conditional(
+            response, etag, self.get_cache_control(request),
+            self.vary_headers
+        )
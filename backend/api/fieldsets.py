@@ -0,0 +1,78 @@
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+
+def split_names(values):
+    return {
+        name.strip() for value in values for name in value.split(',')
+        if name.strip()
+    }
+
+
+class Fieldset:
+    """Поля ответа из ``?fields=`` и ``?omit=``.
+
+    Поля вложенных сериализаторов указываются через точку:
+    ``?fields=id,name,author.username``.
+    """
+
+    def __init__(self, include=(), omit=()):
+        self.include = set(include)
+        self.omit = set(omit)
+
+    @classmethod
+    def from_request(cls, request):
+        if request is None or request.method not in SAFE_METHODS:
+            return cls()
+        return cls(
+            split_names(request.GET.getlist(FIELDS_PARAM)),
+            split_names(request.GET.getlist(OMIT_PARAM)),
+        )
+
+    def __bool__(self):
+        return bool(self.include or self.omit)
+
+    def nested(self, name):
+        prefix = f'{name}.'
+        return Fieldset(
+            {path[len(prefix):] for path in self.include
+             if path.startswith(prefix)},
+            {path[len(prefix):] for path in self.omit
+             if path.startswith(prefix)},
+        )
+
+    def keeps(self, name):
+        included = {path.split('.', 1)[0] for path in self.include}
+        return (not included or name in included) and name not in self.omit
+
+    def keeps_nested(self, name, field):
+        return self.keeps(name) and self.nested(name).keeps(field)
+
+
+def get_field_path(serializer):
+    names = []
+    while serializer.parent is not None:
+        if serializer.field_name:
+            names.append(serializer.field_name)
+        serializer = serializer.parent
+    return reversed(names)
+
+
+class SparseFieldsetMixin:
+    def get_fieldset(self):
+        fieldset = Fieldset.from_request(self.context.get('request'))
+        for name in get_field_path(self):
+            fieldset = fieldset.nested(name)
+        return fieldset
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fieldset = self.get_fieldset()
+        if not fieldset:
+            return fields
+        return {
+            name: field for name, field in fields.items()
+            if fieldset.keeps(name)
+        }
@@ -0,0 +1,90 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.dispatch import Signal
+
+renditions_ready = Signal()
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.IMAGE_RENDITION_WORKERS,
+            thread_name_prefix='image-renditions'
+        )
+    return _executor
+
+
+def schedule_renditions(instance, field_name, renditions):
+    args = (type(instance), instance.pk, field_name, renditions)
+    if not settings.IMAGE_RENDITION_WORKERS:
+        transaction.on_commit(lambda: make_renditions(*args))
+        return
+    transaction.on_commit(lambda: get_executor().submit(
+        run_in_worker, *args
+    ))
+
+
+def run_in_worker(*args):
+    try:
+        make_renditions(*args)
+    finally:
+        close_old_connections()
+
+
+def make_renditions(model, pk, field_name, renditions):
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        return
+    source = getattr(instance, field_name)
+    stem = os.path.splitext(os.path.basename(source.name))[0]
+    previous = [getattr(instance, name).name for name in renditions]
+    updates = {}
+    try:
+        with source.open('rb'), Image.open(source) as image:
+            image = ImageOps.exif_transpose(image)
+            if image.mode not in ('RGB', 'RGBA'):
+                image = image.convert('RGBA')
+            for rendition_field, size in renditions.items():
+                rendition = image.copy()
+                rendition.thumbnail(size, Image.LANCZOS)
+                buffer = BytesIO()
+                rendition.save(buffer, 'WEBP',
+                               quality=settings.IMAGE_RENDITION_QUALITY)
+                field = getattr(instance, rendition_field)
+                field.save(f'{stem}_{rendition_field}.webp',
+                           ContentFile(buffer.getvalue()), save=False)
+                updates[rendition_field] = field.name
+    except (OSError, ValueError):
+        delete_files(source.storage, updates.values())
+        return
+    if model.objects.filter(
+        pk=pk, **{field_name: source.name}
+    ).update(**updates):
+        delete_files(source.storage, previous)
+        renditions_ready.send(sender=model, instance=instance)
+    else:
+        # Картинку успели заменить или рецепт удалили: новые превью
+        # никому не достанутся.
+        delete_files(source.storage, updates.values())
+
+
+def delete_files(storage, names):
+    for name in names:
+        if name:
+            storage.delete(name)
+
+
+def delete_renditions(instance, field_name, renditions):
+    storage = getattr(instance, field_name).storage
+    names = [getattr(instance, name).name for name in renditions]
+    transaction.on_commit(lambda: delete_files(storage, names))
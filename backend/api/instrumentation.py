@@ -0,0 +1,260 @@
+import bisect
+import json
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+
+logger = logging.getLogger('foodgram.requests')
+
+LATENCY_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+current_metrics = ContextVar('current_metrics', default=None)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.view_time = 0.0
+        self.render_time = 0.0
+        self.view_started = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - started
+
+
+def record_query(execute, sql, params, many, context):
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+def install_query_counter(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class Histogram:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+
+    def observe(self, view, latency, queries):
+        with self.lock:
+            stats = self.views.setdefault(view, {
+                'count': 0,
+                'latency_sum': 0.0,
+                'max_queries': 0,
+                'buckets': [0] * (len(LATENCY_BUCKETS) + 1),
+            })
+            stats['count'] += 1
+            stats['latency_sum'] += latency
+            stats['max_queries'] = max(stats['max_queries'], queries)
+            stats['buckets'][bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                view: {
+                    'count': stats['count'],
+                    'latency_avg': round(
+                        stats['latency_sum'] / stats['count'], 2
+                    ),
+                    'max_queries': stats['max_queries'],
+                    'buckets': dict(zip(
+                        [str(bound) for bound in LATENCY_BUCKETS] + ['+Inf'],
+                        stats['buckets']
+                    )),
+                }
+                for view, stats in self.views.items()
+            }
+
+    def reset(self):
+        with self.lock:
+            self.views.clear()
+
+
+histogram = Histogram()
+
+
+class TimedJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        metrics = current_metrics.get()
+        started = time.perf_counter()
+        try:
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+        finally:
+            if metrics is not None:
+                metrics.render_time += time.perf_counter() - started
+
+
+def iter_timed(content, metrics):
+    iterator = iter(content)
+    while True:
+        token = current_metrics.set(metrics)
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            current_metrics.reset(token)
+        yield chunk
+
+
+def get_view_name(request):
+    match = request.resolver_match
+    if match is None:
+        return f'{request.method} {request.path}'
+    return f'{request.method} {match.url_name or match.view_name}'
+
+
+class InstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            # Синхронные хуки Django под ASGI вызывал бы через sync_to_async,
+            # то есть с переходом в поток на каждый запрос.
+            self.process_view = self.aprocess_view
+            self.process_template_response = self.aprocess_template_response
+        # Под ASGI запросы к БД выполняются в потоках sync_to_async, поэтому
+        # счётчик ставится на каждое соединение, а метрики запроса берутся
+        # из contextvar, который asgiref переносит в эти потоки.
+        connection_created.connect(
+            install_query_counter, dispatch_uid='install_query_counter'
+        )
+        for connection in connections.all():
+            install_query_counter(connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response, metrics, started)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response, metrics, started)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        self.start_view()
+
+    def process_template_response(self, request, response):
+        self.stop_view()
+        return response
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        self.start_view()
+
+    async def aprocess_template_response(self, request, response):
+        self.stop_view()
+        return response
+
+    def start_view(self):
+        metrics = current_metrics.get()
+        if metrics is not None:
+            metrics.view_started = (time.perf_counter(), metrics.db_time)
+
+    def stop_view(self):
+        # Ответ DRF рендерится после выхода из view, поэтому время от вызова
+        # view до этого момента за вычетом запросов к БД — это в основном
+        # serializer.data, а кодирование JSON попадает в render.
+        metrics = current_metrics.get()
+        if metrics is not None and metrics.view_started is not None:
+            started, db_time = metrics.view_started
+            metrics.view_time = (
+                time.perf_counter() - started - (metrics.db_time - db_time)
+            )
+
+    def finish(self, request, response, metrics, started):
+        if isinstance(response, StreamingHttpResponse):
+            # Тело потокового ответа формируется уже после возврата из
+            # view, поэтому метрики подводятся, когда поток дочитан.
+            response.streaming_content = self.stream(
+                request, response, response.streaming_content, metrics,
+                started
+            )
+            return response
+        latency = self.record(request, response, metrics, started)
+        if settings.SERVER_TIMING:
+            response['Server-Timing'] = (
+                f'db;desc="{metrics.queries} queries";'
+                f'dur={metrics.db_time * 1000:.1f}, '
+                f'view;dur={metrics.view_time * 1000:.1f}, '
+                f'render;dur={metrics.render_time * 1000:.1f}, '
+                f'total;dur={latency:.1f}'
+            )
+        return response
+
+    def stream(self, request, response, content, metrics, started):
+        try:
+            yield from iter_timed(content, metrics)
+        finally:
+            # Статус и часть тела уже отданы клиенту: исключение здесь
+            # только оборвёт поток, поэтому превышение бюджета логируется.
+            self.record(request, response, metrics, started, strict=False)
+
+    def record(self, request, response, metrics, started, strict=True):
+        latency = (time.perf_counter() - started) * 1000
+        view = get_view_name(request)
+
+        histogram.observe(view, latency, metrics.queries)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'view': view,
+                'status': response.status_code,
+                'queries': metrics.queries,
+                'db_ms': round(metrics.db_time * 1000, 2),
+                'view_ms': round(metrics.view_time * 1000, 2),
+                'render_ms': round(metrics.render_time * 1000, 2),
+                'total_ms': round(latency, 2),
+            }))
+        self.check_budget(view, metrics.queries, strict)
+        return latency
+
+    def check_budget(self, view, queries, strict=True):
+        budget = settings.QUERY_BUDGETS.get(view)
+        if budget is None or queries <= budget:
+            return
+        message = (
+            f'{view}: {queries} запросов к БД при бюджете {budget}'
+        )
+        if strict and settings.QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
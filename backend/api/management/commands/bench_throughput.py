@@ -0,0 +1,223 @@
+import asyncio
+import json
+import time
+from collections import Counter
+from urllib.parse import quote, urlsplit
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from recipes.models import Recipe
+from .benchmark_api import PERCENTILES, percentile
+from .seed_data import PREFIX
+
+User = get_user_model()
+
+PATHS = (
+    '/api/recipes/?limit=6',
+    '/api/recipes/{recipe}/',
+    '/api/tags/',
+    '/api/ingredients/?name=мо',
+    '/api/recipes/download_shopping_cart/?format=pdf',
+)
+NO_BODY_STATUSES = (204, 304)
+
+
+class PathStats:
+    def __init__(self):
+        self.latencies = []
+        self.statuses = Counter()
+        self.errors = 0
+
+    def summary(self, duration):
+        latencies = sorted(latency * 1000 for latency in self.latencies)
+        summary = {
+            'requests': len(latencies),
+            'rps': round(len(latencies) / duration, 1),
+            'errors': self.errors,
+            'statuses': {
+                str(code): count for code, count in self.statuses.items()
+            },
+        }
+        if latencies:
+            summary.update({
+                f'p{percent}': round(percentile(latencies, percent), 2)
+                for percent in PERCENTILES
+            })
+        return summary
+
+
+async def read_response(reader):
+    head = (await reader.readuntil(b'\r\n\r\n')).decode('latin1')
+    status_line, *lines = head.rstrip('\r\n').split('\r\n')
+    status = int(status_line.split()[1])
+    headers = {}
+    for line in lines:
+        name, _, value = line.partition(':')
+        headers[name.strip().lower()] = value.strip().lower()
+    keep_alive = headers.get('connection') != 'close'
+    if status in NO_BODY_STATUSES:
+        pass
+    elif headers.get('transfer-encoding') == 'chunked':
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if not size:
+                break
+    elif 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    else:
+        await reader.read()
+        keep_alive = False
+    return status, keep_alive
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет пропускную способность запущенного сервера при '
+        'параллельных клиентах (WSGI и ASGI)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://localhost:8000')
+        parser.add_argument('--concurrency', type=int, default=100)
+        parser.add_argument('--duration', type=float, default=10)
+        parser.add_argument('--warmup', type=float, default=2)
+        parser.add_argument(
+            '--path', action='append', dest='paths',
+            help='Путь запроса; {recipe} заменяется на id рецепта'
+        )
+        parser.add_argument('--anonymous', action='store_true',
+                            help='Не передавать токен пользователя')
+        parser.add_argument('--label', default='')
+        parser.add_argument('--output', help='Сохранить результаты в JSON')
+        parser.add_argument('--compare',
+                            help='JSON предыдущего запуска для сравнения')
+
+    def handle(self, *args, **options):
+        url = urlsplit(options['url'])
+        if url.scheme != 'http' or not url.hostname:
+            raise CommandError('Поддерживается только http://host[:port]')
+        user = User.objects.filter(
+            username__startswith=f'{PREFIX}_'
+        ).order_by('pk').first()
+        recipe_ids = list(Recipe.objects.order_by('-pub_date').values_list(
+            'pk', flat=True
+        )[:100])
+        if user is None or not recipe_ids:
+            raise CommandError('Нет данных: сначала выполните seed_data')
+        headers = {
+            'Host': url.netloc,
+            'Accept': 'application/json, application/pdf',
+        }
+        if not options['anonymous']:
+            token, _ = Token.objects.get_or_create(user=user)
+            headers['Authorization'] = f'Token {token.key}'
+
+        self.target = (url.hostname, url.port or 80)
+        self.headers = ''.join(
+            f'{name}: {value}\r\n' for name, value in headers.items()
+        )
+        self.recipe_ids = recipe_ids
+        paths = options['paths'] or PATHS
+        if options['warmup']:
+            asyncio.run(self.run(
+                paths, options['concurrency'], options['warmup']
+            ))
+        stats = asyncio.run(self.run(
+            paths, options['concurrency'], options['duration']
+        ))
+
+        results = {
+            path: path_stats.summary(options['duration'])
+            for path, path_stats in stats.items()
+        }
+        results['total'] = {
+            'requests': sum(result['requests'] for result in results.values()),
+            'errors': sum(result['errors'] for result in results.values()),
+        }
+        results['total']['rps'] = round(
+            results['total']['requests'] / options['duration'], 1
+        )
+        for path, result in results.items():
+            self.stdout.write(f'{path:<52} ' + '  '.join(
+                f'{key}: {value}' for key, value in result.items()
+            ))
+
+        report = {
+            'label': options['label'],
+            'created': timezone.now().isoformat(),
+            'options': {
+                key: options[key]
+                for key in ('url', 'concurrency', 'duration', 'anonymous')
+            },
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as file:
+                self.compare(json.load(file)['results'], results)
+
+    async def run(self, paths, concurrency, duration):
+        stats = {path: PathStats() for path in paths}
+        deadline = time.monotonic() + duration
+        await asyncio.gather(*(
+            self.client(number, paths, stats, deadline)
+            for number in range(concurrency)
+        ))
+        return stats
+
+    def build_request(self, path, number):
+        path = path.format(
+            recipe=self.recipe_ids[number % len(self.recipe_ids)]
+        )
+        return (
+            f'GET {quote(path, safe="/?&=%:,")} HTTP/1.1\r\n'
+            f'{self.headers}\r\n'
+        ).encode()
+
+    async def client(self, offset, paths, stats, deadline):
+        reader = writer = None
+        number = offset
+        while time.monotonic() < deadline:
+            path = paths[number % len(paths)]
+            request = self.build_request(path, number)
+            number += 1
+            started = time.perf_counter()
+            try:
+                if writer is None:
+                    reader, writer = await asyncio.open_connection(
+                        *self.target
+                    )
+                writer.write(request)
+                await writer.drain()
+                status, keep_alive = await read_response(reader)
+            except (OSError, asyncio.IncompleteReadError, ValueError):
+                stats[path].errors += 1
+                keep_alive = False
+            else:
+                stats[path].latencies.append(time.perf_counter() - started)
+                stats[path].statuses[status] += 1
+            if not keep_alive and writer is not None:
+                writer.close()
+                writer = None
+        if writer is not None:
+            writer.close()
+
+    def compare(self, previous, current):
+        self.stdout.write('Изменения относительно предыдущего запуска:')
+        for path, result in current.items():
+            if path not in previous:
+                continue
+            before = previous[path]
+            line = (
+                f'{path:<52} rps: {before["rps"]} -> {result["rps"]} '
+                f'({result["rps"] / (before["rps"] or 1):.2f}x)'
+            )
+            if 'p99' in result and 'p99' in before:
+                line += f'  p99: {before["p99"]} -> {result["p99"]} мс'
+            self.stdout.write(line)
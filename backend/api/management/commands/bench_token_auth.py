@@ -0,0 +1,43 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.authentication import CachedTokenAuthentication, token_cache
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает аутентификацию по токену с кэшем и без него'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(is_active=True).order_by('pk').first()
+        if user is None:
+            raise CommandError('Нет пользователей')
+        token, _ = Token.objects.get_or_create(user=user)
+        request = Request(APIRequestFactory().get(
+            '/', HTTP_AUTHORIZATION=f'Token {token.key}'
+        ))
+        token_cache.clear()
+        for authentication in (TokenAuthentication(),
+                               CachedTokenAuthentication()):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                for _ in range(options['repeat']):
+                    authentication.authenticate(request)
+                elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'{type(authentication).__name__:<28} '
+                f'{elapsed / options["repeat"] * 1e6:>8.1f} мкс/запрос  '
+                f'запросов к БД: {len(queries)}'
+            )
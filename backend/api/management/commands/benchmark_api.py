@@ -0,0 +1,213 @@
+import json
+import logging
+import statistics
+import tempfile
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from ingridients.models import Ingredient
+from recipes import cache
+from recipes.models import (FavoriteRecipe, IngredientsAmount, Recipe,
+                            ShoppingCart,)
+from tags.models import Tag
+from users.models import Follow
+from .seed_data import PREFIX
+
+User = get_user_model()
+
+PERCENTILES = (50, 90, 95, 99)
+IMAGE = (
+    'data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAA'
+    'DUlEQVR42mP8z8BQDwAEhQGAhKmMIQAAAABJRU5ErkJggg=='
+)
+
+
+def percentile(values, percent):
+    return values[min(len(values) - 1, len(values) * percent // 100)]
+
+
+def summarize(timings, queries):
+    timings = sorted(timing * 1000 for timing in timings)
+    summary = {
+        f'p{percent}': round(percentile(timings, percent), 2)
+        for percent in PERCENTILES
+    }
+    summary['mean'] = round(statistics.mean(timings), 2)
+    summary['queries'] = statistics.median(queries)
+    summary['max_queries'] = max(queries)
+    return summary
+
+
+def rolled_back(request):
+    def wrapper(number):
+        with transaction.atomic():
+            response = request(number)
+            transaction.set_rollback(True)
+        return response
+    return wrapper
+
+
+class Command(BaseCommand):
+    help = 'Замеряет задержки и число запросов основных эндпоинтов API'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--cold', action='store_true',
+                            help='Сбрасывать кэш рецептов перед запросом')
+        parser.add_argument('--label', default='')
+        parser.add_argument('--output', help='Сохранить результаты в JSON')
+        parser.add_argument('--compare',
+                            help='JSON предыдущего запуска для сравнения')
+
+    def handle(self, *args, **options):
+        logging.getLogger('fontTools').setLevel(logging.ERROR)
+        logging.getLogger('foodgram.requests').setLevel(logging.WARNING)
+        user = User.objects.filter(
+            username__startswith=f'{PREFIX}_', followers__isnull=False
+        ).order_by('pk').first()
+        if user is None:
+            raise CommandError('Нет данных: сначала выполните seed_data')
+        token, _ = Token.objects.get_or_create(user=user)
+        client = APIClient(SERVER_NAME='localhost')
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+        with tempfile.TemporaryDirectory() as media_root, \
+                override_settings(MEDIA_ROOT=media_root):
+            results = self.run_scenarios(
+                self.get_scenarios(client, user), options
+            )
+
+        report = {
+            'label': options['label'],
+            'created': timezone.now().isoformat(),
+            'scale': {
+                'users': User.objects.count(),
+                'follows': Follow.objects.count(),
+                'recipes': Recipe.objects.count(),
+                'ingredient_amounts': IngredientsAmount.objects.count(),
+                'favorites': FavoriteRecipe.objects.count(),
+                'shopping_carts': ShoppingCart.objects.count(),
+            },
+            'options': {
+                key: options[key] for key in ('repeat', 'warmup', 'cold')
+            },
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as file:
+                self.compare(json.load(file)['results'], results)
+
+    def get_scenarios(self, client, user):
+        tags = list(Tag.objects.values_list('slug', flat=True)[:2])
+        recipe_ids = list(Recipe.objects.values_list('pk', flat=True)[:500])
+        own_recipe = Recipe.objects.filter(author=user).first()
+        ingredients = list(Ingredient.objects.values_list('pk', flat=True)[:8])
+        tag_ids = list(Tag.objects.values_list('pk', flat=True)[:2])
+        tag_query = '&'.join(f'tags={slug}' for slug in tags)
+        payload = {
+            'name': 'Бенчмарк',
+            'text': 'Описание',
+            'cooking_time': 10,
+            'image': IMAGE,
+            'tags': tag_ids,
+            'ingredients': [
+                {'id': pk, 'amount': amount}
+                for amount, pk in enumerate(ingredients, 1)
+            ],
+        }
+
+        scenarios = {
+            'recipes list': lambda number: client.get(
+                '/api/recipes/?limit=6'
+            ),
+            'recipes list filtered': lambda number: client.get(
+                f'/api/recipes/?limit=6&{tag_query}&is_favorited=1'
+            ),
+            'recipe detail': lambda number: client.get(
+                f'/api/recipes/{recipe_ids[number % len(recipe_ids)]}/'
+            ),
+            'recipe create': rolled_back(lambda number: client.post(
+                '/api/recipes/', payload, format='json'
+            )),
+            'subscriptions': lambda number: client.get(
+                '/api/users/subscriptions/?limit=6'
+            ),
+            'ingredients list': lambda number: client.get(
+                '/api/ingredients/?name=мо'
+            ),
+            'shopping cart download': lambda number: client.get(
+                '/api/recipes/download_shopping_cart/'
+            ),
+        }
+        if own_recipe is not None:
+            scenarios['recipe update'] = rolled_back(
+                lambda number: client.patch(
+                    f'/api/recipes/{own_recipe.pk}/',
+                    {
+                        'name': f'Бенчмарк {number}',
+                        'ingredients': [
+                            {'id': pk, 'amount': amount + number % 3}
+                            for amount, pk in enumerate(ingredients, 1)
+                        ],
+                    },
+                    format='json'
+                )
+            )
+        return scenarios
+
+    def run_scenarios(self, scenarios, options):
+        results = {}
+        for name, request in scenarios.items():
+            for number in range(options['warmup']):
+                self.call(request, number, options['cold'])
+            timings, queries = [], []
+            for number in range(options['repeat']):
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    response = self.call(request, number, options['cold'])
+                    timings.append(time.perf_counter() - started)
+                queries.append(len(captured))
+                if response.status_code >= 400:
+                    raise CommandError(
+                        f'{name}: ответ {response.status_code}'
+                    )
+            results[name] = summarize(timings, queries)
+            self.stdout.write(
+                f'{name:<24} ' + '  '.join(
+                    f'{key}: {value}' for key, value in results[name].items()
+                )
+            )
+        return results
+
+    @staticmethod
+    def call(request, number, cold):
+        if cold:
+            cache.invalidate_all()
+        response = request(number)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return response
+
+    def compare(self, previous, current):
+        self.stdout.write('Изменения относительно предыдущего запуска:')
+        for name, result in current.items():
+            if name not in previous:
+                continue
+            before = previous[name]
+            self.stdout.write(
+                f'{name:<24} '
+                f'p50: {before["p50"]} -> {result["p50"]} мс '
+                f'({result["p50"] - before["p50"]:+.2f})  '
+                f'запросов: {before["queries"]} -> {result["queries"]}'
+            )
@@ -0,0 +1,160 @@
+import random
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+
+from ingridients.models import Ingredient
+from recipes import cache
+from recipes.models import (FavoriteRecipe, IngredientsAmount, Recipe,
+                            ShoppingCart,)
+from tags.models import Tag
+from users.models import Follow
+
+User = get_user_model()
+
+PREFIX = 'bench'
+PASSWORD = 'bench-password'
+TAGS = (
+    ('Завтрак', '#E26C2D', 'breakfast'),
+    ('Обед', '#49B64E', 'lunch'),
+    ('Ужин', '#8775D2', 'dinner'),
+)
+
+
+def bulk_insert(model, objects, batch_size):
+    objects = iter(objects)
+    while True:
+        batch = list(islice(objects, batch_size))
+        if not batch:
+            return
+        model.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def new_ids(model, last_id):
+    return list(model.objects.filter(
+        pk__gt=last_id
+    ).order_by('pk').values_list('pk', flat=True))
+
+
+def last_id(model):
+    return model.objects.aggregate(last=Max('pk'))['last'] or 0
+
+
+class Command(BaseCommand):
+    help = 'Заполняет базу синтетическими данными для нагрузочных тестов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--recipes', type=int, default=5000)
+        parser.add_argument('--ingredients-per-recipe', type=int, default=8)
+        parser.add_argument('--follows', type=int, default=20,
+                            help='Подписок на пользователя')
+        parser.add_argument('--favorites', type=int, default=20,
+                            help='Рецептов в избранном у пользователя')
+        parser.add_argument('--cart', type=int, default=10,
+                            help='Рецептов в списке покупок у пользователя')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--clear', action='store_true',
+                            help='Удалить ранее созданные данные')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        batch_size = options['batch_size']
+        if options['clear']:
+            User.objects.filter(username__startswith=f'{PREFIX}_').delete()
+        if not Ingredient.objects.exists():
+            call_command('load_ingredients', stdout=self.stdout)
+        if not Tag.objects.exists():
+            Tag.objects.bulk_create(
+                Tag(name=name, color=color, slug=slug)
+                for name, color, slug in TAGS
+            )
+        ingredient_ids = list(Ingredient.objects.values_list('pk', flat=True))
+        tag_ids = list(Tag.objects.values_list('pk', flat=True))
+        password = make_password(PASSWORD)
+
+        with transaction.atomic():
+            offset = User.objects.filter(
+                username__startswith=f'{PREFIX}_'
+            ).count()
+            start = last_id(User)
+            bulk_insert(User, (
+                User(
+                    username=f'{PREFIX}_{number}',
+                    email=f'{PREFIX}_{number}@example.com',
+                    first_name='Bench',
+                    last_name=f'User {number}',
+                    password=password,
+                )
+                for number in range(offset, offset + options['users'])
+            ), batch_size)
+            user_ids = new_ids(User, start)
+
+            start = last_id(Recipe)
+            bulk_insert(Recipe, (
+                Recipe(
+                    author_id=rng.choice(user_ids),
+                    name=f'Рецепт {number}',
+                    text=' '.join(rng.choices(
+                        ('вкусно', 'быстро', 'просто', 'сытно', 'полезно'),
+                        k=30
+                    )),
+                    cooking_time=rng.randint(5, 180),
+                )
+                for number in range(options['recipes'])
+            ), batch_size)
+            recipe_ids = new_ids(Recipe, start)
+
+            bulk_insert(Recipe.tags.through, (
+                Recipe.tags.through(recipe_id=recipe_id, tag_id=tag_id)
+                for recipe_id in recipe_ids
+                for tag_id in rng.sample(
+                    tag_ids, rng.randint(1, min(2, len(tag_ids)))
+                )
+            ), batch_size)
+            bulk_insert(IngredientsAmount, (
+                IngredientsAmount(
+                    recipe_id=recipe_id,
+                    ingredient_id=ingredient_id,
+                    amount=rng.randint(1, 500)
+                )
+                for recipe_id in recipe_ids
+                for ingredient_id in rng.sample(
+                    ingredient_ids,
+                    min(options['ingredients_per_recipe'],
+                        len(ingredient_ids))
+                )
+            ), batch_size)
+            bulk_insert(Follow, (
+                Follow(user_id=user_id, author_id=author_id)
+                for user_id in user_ids
+                for author_id in [
+                    author_id for author_id in rng.sample(
+                        user_ids, min(options['follows'] + 1, len(user_ids))
+                    ) if author_id != user_id
+                ][:options['follows']]
+            ), batch_size)
+            for model, per_user in ((FavoriteRecipe, options['favorites']),
+                                    (ShoppingCart, options['cart'])):
+                bulk_insert(model, (
+                    model(user_id=user_id, recipe_id=recipe_id)
+                    for user_id in user_ids
+                    for recipe_id in rng.sample(
+                        recipe_ids, min(per_user, len(recipe_ids))
+                    )
+                ), batch_size)
+
+        call_command('recount_recipe_counters', stdout=self.stdout)
+        call_command('rebuild_feeds', stdout=self.stdout)
+        call_command('update_search_vectors', stdout=self.stdout)
+        cache.invalidate_all()
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано пользователей: {len(user_ids)}, '
+            f'рецептов: {len(recipe_ids)}'
+        ))
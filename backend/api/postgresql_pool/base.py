@@ -0,0 +1,93 @@
+import os
+import threading
+
+from django.db.backends.postgresql import base
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+_pools = {}
+_lock = threading.Lock()
+
+
+class ConnectionPool:
+    def __init__(self, size):
+        self.size = size
+        self.lock = threading.Lock()
+        self.idle = []
+
+    def get(self):
+        with self.lock:
+            return self.idle.pop() if self.idle else (None, None)
+
+    def put(self, connection, isolation_level):
+        if (
+            not connection.closed
+            and connection.info.transaction_status == TRANSACTION_STATUS_IDLE
+        ):
+            with self.lock:
+                if len(self.idle) < self.size:
+                    self.idle.append((connection, isolation_level))
+                    return
+        connection.close()
+
+    def clear(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for connection, _ in idle:
+            connection.close()
+
+
+def get_pool(settings_dict):
+    key = (os.getpid(), settings_dict['HOST'], settings_dict['PORT'],
+           settings_dict['NAME'], settings_dict['USER'])
+    with _lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(settings_dict.get('POOL_SIZE', 10))
+        return _pools[key]
+
+
+def is_alive(connection):
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        if connection.info.transaction_status != TRANSACTION_STATUS_IDLE:
+            connection.rollback()
+    except base.Database.Error:
+        return False
+    return True
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL с пулом соединений внутри процесса.
+
+    При закрытии соединение возвращается в пул, а не рвётся, поэтому
+    ``CONN_MAX_AGE`` всегда равен 0: соединение отдаётся в пул в конце
+    каждого запроса и достаётся любым потоком процесса. С постоянными
+    соединениями Django каждый поток держал бы своё соединение мимо пула.
+    """
+
+    def __init__(self, settings_dict, *args, **kwargs):
+        settings_dict['CONN_MAX_AGE'] = 0
+        super().__init__(settings_dict, *args, **kwargs)
+
+    def get_new_connection(self, conn_params):
+        pool = get_pool(self.settings_dict)
+        connection, isolation_level = pool.get()
+        while connection is not None:
+            if not self.settings_dict['CONN_HEALTH_CHECKS'] or is_alive(
+                connection
+            ):
+                self.isolation_level = isolation_level
+                return connection
+            connection.close()
+            connection, isolation_level = pool.get()
+        return super().get_new_connection(conn_params)
+
+    def _close(self):
+        if self.connection is None:
+            return
+        with self.wrap_database_errors:
+            if self.errors_occurred:
+                return self.connection.close()
+            get_pool(self.settings_dict).put(
+                self.connection, self.isolation_level
+            )
@@ -0,0 +1,134 @@
+import sys
+import threading
+import time
+
+from django.conf import settings
+
+from api.cache import bump_generation, get_generations
+from api.conditional import make_etag
+from api.replicas import primary_reads
+from ingridients.models import Ingredient
+from tags.models import Tag
+
+GENERATION = 'dictionaries'
+
+
+def footprint(value):
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        return size + sum(
+            footprint(key) + footprint(item) for key, item in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        return size + sum(footprint(item) for item in value)
+    return size
+
+
+def by_id(rows):
+    rows = list(rows)
+    table = [None] * (max((row[0] for row in rows), default=-1) + 1)
+    for row in rows:
+        table[row[0]] = row[1:]
+    return table
+
+
+class Stats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.rebuilds = 0
+
+
+class DictionarySnapshot:
+    def __init__(self, stats):
+        self.stats = stats
+        self.tags = by_id(Tag.objects.values_list(
+            'id', 'name', 'color', 'slug'
+        ))
+        self.tag_ids = {
+            tag[2]: pk for pk, tag in enumerate(self.tags) if tag
+        }
+        self.ingredients = by_id(Ingredient.objects.values_list(
+            'id', 'name', 'measurement_unit'
+        ))
+        self.built_at = time.time()
+
+    @staticmethod
+    def lookup(table, pk):
+        return table[pk] if 0 <= pk < len(table) else None
+
+    def tag(self, pk):
+        return self.counted(self.lookup(self.tags, pk))
+
+    def tag_id(self, slug):
+        return self.counted(self.tag_ids.get(slug))
+
+    def ingredient(self, pk):
+        return self.counted(self.lookup(self.ingredients, pk))
+
+    def counted(self, value):
+        if value is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return value
+
+    def info(self):
+        lookups = self.stats.hits + self.stats.misses
+        return {
+            'tags': len(self.tag_ids),
+            'ingredients': sum(1 for row in self.ingredients if row),
+            'bytes': footprint(self.tags) + footprint(self.tag_ids)
+            + footprint(self.ingredients),
+            'built_at': self.built_at,
+            'rebuilds': self.stats.rebuilds,
+            'hits': self.stats.hits,
+            'misses': self.stats.misses,
+            'hit_rate': (
+                round(self.stats.hits / lookups, 4) if lookups else None
+            ),
+        }
+
+
+_stats = Stats()
+_snapshot = None
+_snapshot_generation = None
+_lock = threading.Lock()
+
+
+def is_current(generation, outdated):
+    return (
+        _snapshot is not None
+        and _snapshot is not outdated
+        and _snapshot_generation == generation
+        and time.time() - _snapshot.built_at
+        < settings.DICTIONARY_SNAPSHOT_MAX_AGE
+    )
+
+
+def get_snapshot(outdated=None):
+    """Снимок справочников текущего процесса.
+
+    Поколение в кэше по умолчанию общее только при общем CACHE_BACKEND,
+    поэтому снимок ещё и перестраивается по возрасту. ``outdated`` —
+    снимок, в котором не нашлась существующая запись: он перестраивается
+    один раз, даже если поколение и возраст не изменились.
+    """
+    global _snapshot, _snapshot_generation
+    generation, = get_generations(GENERATION)
+    if not is_current(generation, outdated):
+        with _lock:
+            if not is_current(generation, outdated):
+                with primary_reads():
+                    _snapshot = DictionarySnapshot(_stats)
+                _snapshot_generation = generation
+                _stats.rebuilds += 1
+    return _snapshot
+
+
+def get_etag(path):
+    return make_etag(path, *get_generations(GENERATION))
+
+
+def invalidate():
+    bump_generation(GENERATION)
@@ -0,0 +1,41 @@
+from unittest import mock
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from django.core.cache import cache
+from django.test import override_settings
+
+from api.authentication import TokenCache, token_cache
+from users.models import CustomUser
+
+
+@override_settings(TOKEN_CACHE_BACKEND='default')
+class SharedTokenCacheTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='user@example.com', username='user', password='password'
+        )
+        cls.token = Token.objects.create(user=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def get_me(self, worker):
+        with mock.patch('api.authentication.token_cache', worker):
+            return self.client.get('/api/users/me/')
+
+    def test_logout_is_seen_by_other_workers(self):
+        other_worker = TokenCache()
+        self.assertEqual(self.get_me(token_cache).status_code, 200)
+        self.assertEqual(self.get_me(other_worker).status_code, 200)
+        self.assertEqual(other_worker.hits, 1)
+
+        response = self.client.post('/api/auth/token/logout/')
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.get_me(other_worker).status_code, 401)
+        self.assertEqual(self.get_me(token_cache).status_code, 401)
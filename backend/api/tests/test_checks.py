@@ -0,0 +1,24 @@
+from django.test import SimpleTestCase, override_settings
+
+from api.checks import check_shared_generations
+
+LOCMEM = {'default': {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'
+}}
+SHARED = {'default': {
+    'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+    'LOCATION': 'redis://localhost:6379/1',
+}}
+
+
+class SharedGenerationsCheckTest(SimpleTestCase):
+    @override_settings(CACHES=LOCMEM)
+    def test_local_cache_warns(self):
+        self.assertEqual(
+            [warning.id for warning in check_shared_generations(None)],
+            ['api.W001']
+        )
+
+    @override_settings(CACHES=SHARED)
+    def test_shared_cache_passes(self):
+        self.assertEqual(check_shared_generations(None), [])
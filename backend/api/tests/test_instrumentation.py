@@ -0,0 +1,38 @@
+from rest_framework.test import APITestCase
+
+from django.test import override_settings
+
+from users.models import CustomUser
+
+
+class InstrumentationTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='user@example.com', username='user', password='password'
+        )
+
+    def test_server_timing_reports_view_time(self):
+        response = self.client.get('/api/tags/')
+        metrics = [
+            metric.strip().split(';')[0]
+            for metric in response['Server-Timing'].split(',')
+        ]
+        self.assertEqual(metrics, ['db', 'view', 'render', 'total'])
+
+    def test_requests_are_logged_at_debug(self):
+        with self.assertLogs('foodgram.requests', 'DEBUG') as logs:
+            self.client.get('/api/tags/')
+        self.assertEqual([record.levelname for record in logs.records],
+                         ['DEBUG'])
+
+    @override_settings(
+        QUERY_BUDGET_STRICT=True,
+        QUERY_BUDGETS={'GET recipes-download-shopping-cart': 0}
+    )
+    def test_streamed_budget_overrun_is_logged(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get('/api/recipes/download_shopping_cart/')
+        with self.assertLogs('foodgram.requests', 'WARNING') as logs:
+            b''.join(response.streaming_content)
+        self.assertIn('recipes-download-shopping-cart', logs.output[0])
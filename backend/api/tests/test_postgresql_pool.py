@@ -0,0 +1,14 @@
+from django.test import SimpleTestCase
+
+from api.postgresql_pool.base import DatabaseWrapper
+
+
+class PoolDatabaseWrapperTest(SimpleTestCase):
+    def test_persistent_connections_are_disabled(self):
+        wrapper = DatabaseWrapper({
+            'NAME': 'django', 'USER': 'django', 'PASSWORD': '',
+            'HOST': 'db', 'PORT': 5432, 'CONN_MAX_AGE': 60,
+            'CONN_HEALTH_CHECKS': True, 'OPTIONS': {}, 'TIME_ZONE': None,
+            'AUTOCOMMIT': True, 'ATOMIC_REQUESTS': False,
+        })
+        self.assertEqual(wrapper.settings_dict['CONN_MAX_AGE'], 0)
@@ -0,0 +1,117 @@
+from unittest import mock
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.test import SimpleTestCase
+
+from api import snapshots
+from api.replicas import (REPLICA_DB_ALIAS, ReplicaRouter, primary_reads,
+                          replica_reads, use_replica)
+from recipes.models import Recipe
+from tags.models import Tag
+from users.models import CustomUser
+
+
+class ReplicaRouterTest(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(
+            settings.DATABASES, {REPLICA_DB_ALIAS: {}}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.router = ReplicaRouter()
+
+    def test_writes_go_to_primary(self):
+        self.assertEqual(self.router.db_for_write(Recipe), DEFAULT_DB_ALIAS)
+        with replica_reads():
+            self.assertEqual(
+                self.router.db_for_write(Recipe), DEFAULT_DB_ALIAS
+            )
+
+    def test_safe_reads_go_to_replica(self):
+        self.assertIsNone(self.router.db_for_read(Recipe))
+        with replica_reads():
+            self.assertEqual(
+                self.router.db_for_read(Recipe), REPLICA_DB_ALIAS
+            )
+            with primary_reads():
+                self.assertIsNone(self.router.db_for_read(Recipe))
+        self.assertFalse(use_replica.get())
+
+    def test_without_replica_alias(self):
+        del settings.DATABASES[REPLICA_DB_ALIAS]
+        with replica_reads():
+            self.assertIsNone(self.router.db_for_read(Recipe))
+
+    def test_migrations_run_on_primary_only(self):
+        self.assertTrue(
+            self.router.allow_migrate(DEFAULT_DB_ALIAS, 'recipes')
+        )
+        self.assertFalse(
+            self.router.allow_migrate(REPLICA_DB_ALIAS, 'recipes')
+        )
+
+
+class ReplicaReadViewsTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='user@example.com', username='user', password='password'
+        )
+        cls.token = Token.objects.create(user=cls.user)
+        cls.recipe = Recipe.objects.create(
+            author=cls.user, name='recipe', text='text', cooking_time=5
+        )
+        cls.recipe.tags.add(
+            Tag.objects.create(name='tag', color='#000000', slug='tag')
+        )
+
+    def setUp(self):
+        cache.clear()
+        snapshots.get_snapshot()
+        self.reads = []
+        patcher = mock.patch.object(
+            ReplicaRouter, 'db_for_read', self.record_read
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def record_read(self, model, **hints):
+        self.reads.append(use_replica.get())
+
+    def read_targets(self, method, path, **kwargs):
+        self.reads.clear()
+        response = getattr(self.client, method)(path, **kwargs)
+        self.assertLess(response.status_code, 400, response.content)
+        return set(self.reads)
+
+    def authenticate(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_anonymous_uncached_list_reads_replica(self):
+        self.assertEqual(self.read_targets(
+            'get', '/api/recipes/', data={'ordering': '-favorites_count'}
+        ), {True})
+        self.assertEqual(self.read_targets('get', '/api/tags/'), {True})
+
+    def test_cache_fill_reads_primary(self):
+        self.assertEqual(self.read_targets('get', '/api/recipes/'), {False})
+        self.assertEqual(self.read_targets(
+            'get', f'/api/recipes/{self.recipe.pk}/'
+        ), {False})
+
+    def test_user_state_reads_primary(self):
+        self.authenticate()
+        self.assertEqual(self.read_targets(
+            'post', f'/api/recipes/{self.recipe.pk}/favorite/'
+        ), {False})
+        self.assertEqual(self.read_targets(
+            'get', '/api/recipes/', data={'ordering': '-favorites_count'}
+        ), {False})
+        self.assertEqual(self.read_targets('get', '/api/users/'), {False})
+        response = self.client.get(f'/api/recipes/{self.recipe.pk}/')
+        self.assertTrue(response.data['is_favorited'])
@@ -0,0 +1,45 @@
+import base64
+from io import BytesIO
+from unittest import mock
+
+from PIL import Image
+from rest_framework.serializers import ValidationError
+
+from django.test import SimpleTestCase
+
+from api.utils import Base64ImageField
+
+
+def make_png():
+    buffer = BytesIO()
+    Image.new('RGB', (8, 8), 'red').save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class Base64ImageFieldTest(SimpleTestCase):
+    def setUp(self):
+        self.field = Base64ImageField()
+        self.png = make_png()
+
+    def decode(self, payload):
+        return self.field.to_internal_value(
+            'data:image/png;base64,' + payload
+        )
+
+    def test_line_wrapped_payload_is_decoded_in_chunks(self):
+        encoded = base64.encodebytes(self.png).decode()
+        with mock.patch('api.utils.DECODE_CHUNK_SIZE', 10):
+            file = self.decode(encoded)
+        self.assertEqual(file.name, 'photo.png')
+        self.assertEqual(file.read(), self.png)
+
+    def test_missing_base64_marker_is_rejected(self):
+        with self.assertRaises(ValidationError):
+            self.field.to_internal_value('data:image/png,' + 'A' * 8)
+
+    def test_broken_payload_is_rejected(self):
+        encoded = base64.b64encode(self.png).decode()
+        for payload in (encoded[:-1], encoded[:8] + '!' + encoded[8:]):
+            with self.subTest(payload=payload[:10]):
+                with self.assertRaises(ValidationError):
+                    self.decode(payload)
@@ -2,11 +2,14 @@ from ingridients.views import IngredientViewSet
 from rest_framework.routers import DefaultRouter
 
 
+from django.conf import settings
 from django.urls import include, path
 
 from tags.views import TagViewSet
 from recipes.views import RecipeViewSet
 from users.views import UsersViewSet
+from . import async_views
+from .views import DictionaryStatsView, RequestStatsView
 
 router_v1 = DefaultRouter()
 router_v1.register('users', UsersViewSet, 'users')
@@ -15,7 +18,11 @@ router_v1.register('ingredients', IngredientViewSet, 'ingredients')
 router_v1.register('recipes', RecipeViewSet, 'recipes')
 
 urlpatterns = (
+    *(async_views.get_urlpatterns(router_v1) if settings.ASYNC_VIEWS else ()),
     path('', include(router_v1.urls)),
     path('', include('djoser.urls')),
     path('auth/', include('djoser.urls.authtoken')),
+    path('metrics/', RequestStatsView.as_view(), name='metrics'),
+    path('metrics/dictionaries/', DictionaryStatsView.as_view(),
+         name='metrics-dictionaries'),
 )
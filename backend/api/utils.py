@@ -1,14 +1,44 @@
+import binascii
 from base64 import b64decode
+from tempfile import SpooledTemporaryFile
 
 from rest_framework.serializers import ImageField
 
-from django.core.files.base import ContentFile
+from django.conf import settings
+from django.core.files import File
+
+DECODE_CHUNK_SIZE = 64 * 1024
+
+
+def decode_base64(data, file):
+    # Кусок можно декодировать, только если в нём кратное 4 число символов
+    # base64, а переносы строк и пробелы эту кратность сдвигают: их убираем,
+    # а хвост переносим в следующий кусок.
+    rest = ''
+    for start in range(0, len(data), DECODE_CHUNK_SIZE):
+        chunk = rest + ''.join(data[start:start + DECODE_CHUNK_SIZE].split())
+        end = len(chunk) - len(chunk) % 4
+        file.write(b64decode(chunk[:end], validate=True))
+        rest = chunk[end:]
+    if rest:
+        raise binascii.Error('Incorrect padding')
 
 
 class Base64ImageField(ImageField):
     def to_internal_value(self, data):
         if isinstance(data, str) and data.startswith('data:image'):
-            format, imgstr = data.split(';base64')
-            ext = format.split('/')[-1]
-            data = ContentFile(b64decode(imgstr), name='photo.' + ext)
+            header, separator, data = data.partition(';base64,')
+            if not separator:
+                self.fail('invalid_image')
+            ext = header.split('/')[-1]
+            file = SpooledTemporaryFile(
+                max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE
+            )
+            try:
+                decode_base64(data, file)
+            except binascii.Error:
+                file.close()
+                self.fail('invalid_image')
+            file.seek(0)
+            data = File(file, name='photo.' + ext)
         return super().to_internal_value(data)
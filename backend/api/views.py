@@ -0,0 +1,22 @@
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from . import snapshots
+from .instrumentation import histogram
+
+
+class RequestStatsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+    pagination_class = None
+
+    def get(self, request):
+        return Response(histogram.snapshot())
+
+
+class DictionaryStatsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+    pagination_class = None
+
+    def get(self, request):
+        return Response(snapshots.get_snapshot().info())
@@ -0,0 +1,14 @@
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'foodgram.settings')
+os.environ.setdefault('ASYNC_VIEWS', 'True')
+
+application = get_asgi_application()
+
+from ingridients.search import warm_up  # noqa: E402
+
+# Индекс поиска ингредиентов строится при старте воркера, а не на первом
+# запросе к /api/ingredients/?name=.
+warm_up()
@@ -5,3 +5,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'foodgram.settings')
 
 application = get_wsgi_application()
+
+from ingridients.search import warm_up  # noqa: E402
+
+# Индекс поиска ингредиентов строится при старте воркера, а не на первом
+# запросе к /api/ingredients/?name=.
+warm_up()
@@ -6,3 +6,6 @@ class IngridientsConfig(AppConfig):
     name = 'ingridients'
     verbose_name = 'Ингридиенты'
     verbose_name_plural = 'Ингридиенты'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,58 @@
+import random
+import time
+
+from rest_framework.test import APIClient
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ingridients.models import Ingredient
+
+
+def percentile(timings, value):
+    return timings[min(len(timings) - 1, int(len(timings) * value))] * 1000
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает задержки поиска ингредиентов с полной выгрузкой'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+
+    def measure(self, client, queries):
+        timings = []
+        for query in queries:
+            started = time.perf_counter()
+            response = client.get('/api/ingredients/', query)
+            timings.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                raise CommandError(f'{query}: {response.status_code}')
+        timings.sort()
+        return timings
+
+    def handle(self, *args, **options):
+        names = list(Ingredient.objects.values_list('name', flat=True))
+        if not names:
+            raise CommandError(
+                'Таблица ингредиентов пуста, выполните load_ingredients'
+            )
+        rng = random.Random(0)
+        queries = []
+        for _ in range(options['requests']):
+            name = rng.choice(names)
+            length = rng.randint(1, min(6, len(name)))
+            if rng.random() < 0.2 and length > 3:
+                typo = rng.randrange(length)
+                name = name[:typo] + name[typo + 1:]
+            queries.append({'name': name[:length]})
+
+        client = APIClient(SERVER_NAME='localhost')
+        self.measure(client, queries[:10])
+        for label, batch in (
+            ('полная выгрузка', [{}] * len(queries)),
+            ('?name=', queries),
+        ):
+            timings = self.measure(client, batch)
+            self.stdout.write(
+                f'{label:>16}: p50 {percentile(timings, 0.5):.2f} мс, '
+                f'p99 {percentile(timings, 0.99):.2f} мс'
+            )
@@ -12,6 +12,11 @@ class Ingredient(models.Model):
         'Единица измерения',
         max_length=50
     )
+    updated_at = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True,
+        db_index=True
+    )
 
     class Meta:
         verbose_name = 'Ингредиент'
@@ -0,0 +1,119 @@
+import bisect
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+from api.cache import bump_generation, get_generations
+from api.replicas import primary_reads
+from .models import Ingredient
+
+GENERATION = 'ingredients'
+MIN_SIMILARITY = 0.3
+
+
+def normalize(value):
+    return value.lower().replace('ё', 'е').strip()
+
+
+def trigrams(value):
+    padded = f'  {value} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class IngredientIndex:
+    def __init__(self, ingredients):
+        self.ingredients = sorted(
+            ingredients, key=lambda ingredient: normalize(ingredient.name)
+        )
+        self.names = [normalize(ingredient.name)
+                      for ingredient in self.ingredients]
+        self.trigram_counts = []
+        self.postings = {}
+        for position, name in enumerate(self.names):
+            name_trigrams = trigrams(name)
+            self.trigram_counts.append(len(name_trigrams))
+            for trigram in name_trigrams:
+                self.postings.setdefault(trigram, []).append(position)
+        self.built_at = time.time()
+
+    def search(self, query, limit):
+        query = normalize(query)
+        if not query:
+            return self.ingredients[:limit]
+        start = bisect.bisect_left(self.names, query)
+        end = bisect.bisect_left(self.names, query + '\uffff', lo=start)
+        positions = list(range(start, min(end, start + limit)))
+        if len(positions) < limit:
+            positions += self.fuzzy_search(
+                query, limit - len(positions), exclude=range(start, end)
+            )
+        return [self.ingredients[position] for position in positions]
+
+    def fuzzy_search(self, query, limit, exclude):
+        query_trigrams = trigrams(query)
+        shared = Counter()
+        for trigram in query_trigrams:
+            shared.update(self.postings.get(trigram, ()))
+        substrings, similar = [], []
+        for position, count in shared.items():
+            if position in exclude:
+                continue
+            name = self.names[position]
+            index = name.find(query)
+            if index != -1:
+                substrings.append((index, name, position))
+                continue
+            similarity = count / (
+                len(query_trigrams) + self.trigram_counts[position] - count
+            )
+            if similarity >= MIN_SIMILARITY:
+                similar.append((-similarity, name, position))
+        substrings.sort()
+        similar.sort()
+        return [position for *_, position in (substrings + similar)[:limit]]
+
+
+_index = None
+_index_generation = None
+_lock = threading.Lock()
+
+
+def is_current(generation):
+    # Как и снимок справочников, индекс перестраивается ещё и по возрасту:
+    # без общего кэша поколение из других воркеров сюда не доходит.
+    return (
+        _index is not None
+        and _index_generation == generation
+        and time.time() - _index.built_at < settings.INGREDIENT_INDEX_MAX_AGE
+    )
+
+
+def get_index():
+    global _index, _index_generation
+    generation, = get_generations(GENERATION)
+    if not is_current(generation):
+        with _lock:
+            if not is_current(generation):
+                with primary_reads():
+                    _index = IngredientIndex(Ingredient.objects.all())
+                _index_generation = generation
+    return _index
+
+
+def warm_up():
+    try:
+        get_index()
+    except DatabaseError:
+        # База ещё не готова (например, до migrate): индекс соберётся
+        # при первом поиске.
+        pass
+    finally:
+        # При gunicorn --preload соединение не должно достаться форкам.
+        connections.close_all()
+
+
+def invalidate():
+    bump_generation(GENERATION)
@@ -0,0 +1,41 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import OperationalError
+from django.test import TestCase, override_settings
+
+from ingridients import search
+from ingridients.models import Ingredient
+
+
+@override_settings(INGREDIENT_INDEX_MAX_AGE=60)
+class IngredientIndexTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.index = search.get_index()
+
+    def test_index_expires(self):
+        # bulk_create не шлёт post_save: так ингредиент появляется в
+        # другом воркере, а поколение в локальном кэше остаётся прежним.
+        Ingredient.objects.bulk_create([
+            Ingredient(name='соль', measurement_unit='г')
+        ])
+        built_at = self.index.built_at
+        with mock.patch('ingridients.search.time.time',
+                        return_value=built_at):
+            self.assertIs(search.get_index(), self.index)
+        with mock.patch('ingridients.search.time.time',
+                        return_value=built_at + 60):
+            index = search.get_index()
+        self.assertEqual(
+            [ingredient.name for ingredient in index.search('сол', 5)],
+            ['соль']
+        )
+
+    def test_warm_up_tolerates_missing_database(self):
+        with mock.patch('ingridients.search.IngredientIndex',
+                        side_effect=OperationalError), \
+                mock.patch('ingridients.search.connections') as connections:
+            search.invalidate()
+            search.warm_up()
+        connections.close_all.assert_called_once_with()
@@ -1,15 +1,44 @@
-from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import permissions
+from rest_framework.response import Response
 from rest_framework.viewsets import ReadOnlyModelViewSet
 
+from django.conf import settings
+
+from api import snapshots
+from api.conditional import ConditionalGetMixin
+from api.replicas import ReplicaReadMixin
+from . import search
 from .models import Ingredient
 from .serializers import IngredientSerializer
 
 
-class IngredientViewSet(ReadOnlyModelViewSet):
+class IngredientViewSet(ReplicaReadMixin, ConditionalGetMixin,
+                        ReadOnlyModelViewSet):
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
-    filter_backends = (DjangoFilterBackend,)
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
-    search_fields = ('^name',)
     pagination_class = None
+    cache_control = {'public': True, 'max_age': settings.DICTIONARY_MAX_AGE}
+
+    def get_etag(self, request, *args, **kwargs):
+        return snapshots.get_etag(request.get_full_path())
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            self.search_list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def search_list(self, request, *args, **kwargs):
+        name = request.query_params.get('name')
+        if name is None:
+            return super().list(request, *args, **kwargs)
+        ingredients = search.get_index().search(
+            name, settings.INGREDIENT_SEARCH_LIMIT
+        )
+        serializer = self.get_serializer(ingredients, many=True)
+        return Response(serializer.data)
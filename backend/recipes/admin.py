@@ -1,6 +1,9 @@
 from django.contrib import admin
+from django.db import transaction
 
-from .models import FavoriteRecipe, IngredientsAmount, Recipe, ShoppingCart
+from .models import (FavoriteRecipe, FeedEntry, IngredientsAmount, Recipe,
+                     ShoppingCart,)
+from .services import change_counter, remove_relations
 
 
 class IngredientsAmountInline(admin.TabularInline):
@@ -21,16 +24,18 @@ class RecipeAdmin(admin.ModelAdmin):
     inlines = (IngredientsAmountInline,)
 
     def favorite_count(self, obj):
-        return obj.favorites.count()
+        return obj.favorites_count
 
     def shopping_count(self, obj):
-        return obj.shopcarts.count()
+        return obj.shopcarts_count
 
     def display_tags(self, obj):
         return ', '.join([tag.name for tag in obj.tags.all()])
 
     favorite_count.short_description = 'В избранном'
+    favorite_count.admin_order_field = 'favorites_count'
     shopping_count.short_description = 'В списке покупок'
+    shopping_count.admin_order_field = 'shopcarts_count'
     display_tags.short_description = 'Теги'
 
 
@@ -39,12 +44,46 @@ class IngredientsAmountAdmin(admin.ModelAdmin):
     list_display = ('recipe', 'ingredient', 'amount')
 
 
+class CountedRelationAdmin(admin.ModelAdmin):
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            previous = change and self.model.objects.values_list(
+                'recipe', flat=True
+            ).get(pk=obj.pk)
+            super().save_model(request, obj, form, change)
+            if previous != obj.recipe_id:
+                if previous:
+                    change_counter(self.model, [previous], -1)
+                change_counter(self.model, [obj.recipe_id], 1)
+
+    def delete_model(self, request, obj):
+        remove_relations(self.model, obj.user, [obj.recipe_id])
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            for user, recipe_ids in self.group_by_user(queryset).items():
+                remove_relations(self.model, user, recipe_ids)
+
+    @staticmethod
+    def group_by_user(queryset):
+        groups = {}
+        for user, recipe in queryset.values_list('user', 'recipe'):
+            groups.setdefault(user, []).append(recipe)
+        return groups
+
+
 @admin.register(FavoriteRecipe)
-class FavoriteRecipeAdmin(admin.ModelAdmin):
+class FavoriteRecipeAdmin(CountedRelationAdmin):
     list_display = ('user', 'recipe',)
     list_filter = ('user', 'recipe',)
 
 
 @admin.register(ShoppingCart)
-class ShoppingCartAdmin(admin.ModelAdmin):
+class ShoppingCartAdmin(CountedRelationAdmin):
     list_display = ('user', 'recipe',)
+
+
+@admin.register(FeedEntry)
+class FeedEntryAdmin(admin.ModelAdmin):
+    list_display = ('user', 'recipe', 'pub_date')
+    list_filter = ('user',)
@@ -0,0 +1,158 @@
+import hashlib
+import json
+from copy import deepcopy
+
+from django.conf import settings
+from django.core.cache import cache
+
+from api.cache import bump_generation, get_generations
+from api.conditional import make_etag
+from api.fieldsets import Fieldset
+from users.models import Follow
+from .models import FavoriteRecipe, Recipe, ShoppingCart
+
+RECIPES_GENERATION = 'recipes'
+LIST_GENERATION = 'recipes:list'
+DETAIL_GENERATION = 'recipes:detail:{}'
+USER_FILTERS = ('is_favorited', 'is_in_shopping_cart')
+COUNTER_ORDERING = ('favorites_count', 'shopcarts_count')
+
+
+def is_cacheable(request):
+    ordering = request.GET.get('ordering', '')
+    fieldset = Fieldset.from_request(request)
+    return not (
+        any(name in request.GET for name in USER_FILTERS)
+        or any(field in ordering for field in COUNTER_ORDERING)
+        or not fieldset.keeps('id')
+        or fieldset.keeps('author')
+        and not fieldset.keeps_nested('author', 'id')
+    )
+
+
+def list_key(request):
+    params = sorted(
+        (name, sorted(request.GET.getlist(name))) for name in request.GET
+    )
+    digest = hashlib.md5(json.dumps(
+        [request.get_host(), request.path, params]
+    ).encode()).hexdigest()
+    generations = get_generations(RECIPES_GENERATION, LIST_GENERATION)
+    return 'recipes:list:{}:{}:{}'.format(*generations, digest)
+
+
+def detail_key(pk):
+    generations = get_generations(
+        RECIPES_GENERATION, DETAIL_GENERATION.format(pk)
+    )
+    return 'recipes:detail:{}:{}:{}'.format(pk, *generations)
+
+
+def _recipes(data):
+    if isinstance(data, list):
+        return data
+    if 'results' in data:
+        return data['results']
+    return [data]
+
+
+def get_payload(key):
+    return cache.get(key)
+
+
+def set_payload(key, data):
+    payload = deepcopy(data)
+    for recipe in _recipes(payload):
+        _set_user_flags(recipe, False, False, False)
+    cache.set(key, payload, settings.RECIPE_CACHE_TIMEOUT)
+
+
+def detail_state(user, pk):
+    return Recipe.objects.with_user_flags(user).filter(pk=pk).values_list(
+        'updated_at', 'is_favorited', 'is_in_shopping_cart',
+        'is_author_subscribed'
+    )
+
+
+def detail_etag(path, state):
+    return make_etag(path, *state, *get_generations(RECIPES_GENERATION))
+
+
+def get_cache_control(user):
+    if user.is_authenticated:
+        return {'private': True, 'no_cache': True}
+    return {'public': True, 'max_age': settings.RECIPE_MAX_AGE}
+
+
+def _flag_querysets(user, recipes):
+    sample = recipes[0]
+    recipe_ids = [recipe['id'] for recipe in recipes]
+    author_ids = {
+        recipe['author']['id'] for recipe in recipes if 'author' in recipe
+    }
+    return (
+        FavoriteRecipe.objects.filter(
+            user=user, recipe__in=recipe_ids
+        ).values_list('recipe', flat=True)
+        if 'is_favorited' in sample else None,
+        ShoppingCart.objects.filter(
+            user=user, recipe__in=recipe_ids
+        ).values_list('recipe', flat=True)
+        if 'is_in_shopping_cart' in sample else None,
+        Follow.objects.filter(
+            user=user, author__in=author_ids
+        ).values_list('author', flat=True)
+        if 'is_subscribed' in sample.get('author', ()) else None,
+    )
+
+
+def _set_user_flags(recipe, is_favorited, is_in_shopping_cart,
+                    is_subscribed):
+    if 'is_favorited' in recipe:
+        recipe['is_favorited'] = is_favorited
+    if 'is_in_shopping_cart' in recipe:
+        recipe['is_in_shopping_cart'] = is_in_shopping_cart
+    if 'is_subscribed' in recipe.get('author', ()):
+        recipe['author']['is_subscribed'] = is_subscribed
+
+
+def _apply_flags(recipes, favorited, in_shopping_cart, subscribed):
+    for recipe in recipes:
+        _set_user_flags(
+            recipe,
+            recipe['id'] in favorited,
+            recipe['id'] in in_shopping_cart,
+            'author' in recipe and recipe['author']['id'] in subscribed,
+        )
+
+
+def apply_user_flags(data, user):
+    recipes = _recipes(data)
+    if user.is_anonymous or not recipes:
+        return
+    _apply_flags(recipes, *(
+        set(queryset) if queryset is not None else set()
+        for queryset in _flag_querysets(user, recipes)
+    ))
+
+
+async def aapply_user_flags(data, user):
+    recipes = _recipes(data)
+    if user.is_anonymous or not recipes:
+        return
+    flags = []
+    for queryset in _flag_querysets(user, recipes):
+        flags.append(
+            set() if queryset is None
+            else {value async for value in queryset}
+        )
+    _apply_flags(recipes, *flags)
+
+
+def invalidate_recipe(pk):
+    bump_generation(LIST_GENERATION)
+    bump_generation(DETAIL_GENERATION.format(pk))
+
+
+def invalidate_all():
+    bump_generation(RECIPES_GENERATION)
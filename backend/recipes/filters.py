@@ -1,23 +1,37 @@
 from django_filters.rest_framework import FilterSet, filters
 
-from tags.models import Tag
+from api import snapshots
+from recipes import search
 from recipes.models import Recipe
 
 
+def get_tag_choices():
+    return [(slug, slug) for slug in snapshots.get_snapshot().tag_ids]
+
+
 class RecipeFilter(FilterSet):
-    tags = filters.ModelMultipleChoiceFilter(
-        queryset=Tag.objects.all(),
-        field_name='tags__slug',
-        to_field_name='slug'
+    tags = filters.MultipleChoiceFilter(
+        choices=get_tag_choices,
+        method='filter_tags'
     )
     is_favorited = filters.BooleanFilter(method='filter_is_favorited')
     is_in_shopping_cart = filters.BooleanFilter(
         method='filter_is_in_shopping_cart'
     )
+    search = filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Recipe
-        fields = ('author', 'tags', 'is_favorited', 'is_in_shopping_cart')
+        fields = ('author', 'tags', 'is_favorited', 'is_in_shopping_cart',
+                  'search')
+
+    def filter_tags(self, queryset, name, value):
+        if not value:
+            return queryset
+        snapshot = snapshots.get_snapshot()
+        return queryset.filter(
+            tags__in=[snapshot.tag_id(slug) for slug in value]
+        ).distinct()
 
     def filter_is_favorited(self, queryset, name, value):
         if value and self.request.user.is_authenticated:
@@ -28,3 +42,8 @@ class RecipeFilter(FilterSet):
         if value and self.request.user.is_authenticated:
             return queryset.filter(shopcarts__user=self.request.user)
         return queryset
+
+    def filter_search(self, queryset, name, value):
+        if value.strip():
+            return search.search(queryset, value)
+        return queryset
@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ingridients.models import Ingredient
+from recipes.serializers import RecipeCreateUpdateSerializer
+from tags.models import Tag
+
+
+class Command(BaseCommand):
+    help = 'Замеряет время и число запросов при валидации рецепта'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int,
+                            default=[10, 50, 200])
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        tags = list(Tag.objects.values_list('id', flat=True))
+        if not tags:
+            raise CommandError('Нет тегов: создайте хотя бы один')
+        for size in options['sizes']:
+            ingredients = list(
+                Ingredient.objects.values_list('id', flat=True)[:size]
+            )
+            if len(ingredients) < size:
+                raise CommandError(
+                    f'Нужно {size} ингредиентов, в базе {len(ingredients)}'
+                )
+            payload = {
+                'tags': tags,
+                'ingredients': [
+                    {'id': pk, 'amount': amount}
+                    for amount, pk in enumerate(ingredients, 1)
+                ],
+            }
+            timings = []
+            for _ in range(options['repeat']):
+                serializer = RecipeCreateUpdateSerializer(
+                    data=payload, partial=True
+                )
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    serializer.is_valid(raise_exception=True)
+                    timings.append(time.perf_counter() - started)
+            timings.sort()
+            self.stdout.write(
+                f'ингредиентов: {size:>4}  тегов: {len(tags):>3}  '
+                f'запросов: {len(queries):>3}  '
+                f'p50: {timings[len(timings) // 2] * 1000:>7.2f} мс  '
+                f'max: {timings[-1] * 1000:>7.2f} мс'
+            )
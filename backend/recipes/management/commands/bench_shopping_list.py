@@ -0,0 +1,68 @@
+import csv
+import logging
+import os
+import random
+import time
+import tracemalloc
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from recipes import shopping_list
+
+DATA_PATH = os.path.join(settings.BASE_DIR, 'data', 'ingredients.csv')
+INGREDIENTS_PER_RECIPE = 8
+
+
+class Command(BaseCommand):
+    help = 'Замеряет время и память генерации PDF списка покупок'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int,
+                            default=[10, 100, 1000])
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        logging.getLogger('fontTools').setLevel(logging.ERROR)
+        with open(DATA_PATH, encoding='utf-8') as f:
+            dictionary = [tuple(row) for row in csv.reader(f)]
+        rng = random.Random(0)
+
+        started = time.perf_counter()
+        shopping_list.render_pdf([])
+        self.stdout.write(
+            f'первая загрузка шрифта: '
+            f'{(time.perf_counter() - started) * 1000:.1f} мс'
+        )
+        for size in options['sizes']:
+            totals = Counter()
+            for _ in range(size):
+                for ingredient in rng.sample(dictionary,
+                                             INGREDIENTS_PER_RECIPE):
+                    totals[ingredient] += rng.randint(1, 500)
+            ingredients = [
+                (name, unit, amount)
+                for (name, unit), amount in sorted(totals.items())
+            ]
+            timings = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                content = shopping_list.render_pdf(ingredients)
+                timings.append(time.perf_counter() - started)
+            tracemalloc.start()
+            shopping_list.render_pdf(ingredients)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            shopping_list.get_pdf(ingredients)
+            started = time.perf_counter()
+            shopping_list.get_pdf(ingredients)
+            cached = time.perf_counter() - started
+            timings.sort()
+            self.stdout.write(
+                f'рецептов: {size:>5}  строк: {len(ingredients):>5}  '
+                f'PDF: {len(content) / 1024:>7.1f} КБ  '
+                f'рендер p50: {timings[len(timings) // 2] * 1000:>8.1f} мс  '
+                f'пик памяти: {peak / 1024 / 1024:>6.1f} МБ  '
+                f'из кэша: {cached * 1000:.2f} мс'
+            )
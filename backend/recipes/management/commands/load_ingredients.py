@@ -1,32 +1,117 @@
 import csv
+import json
 import os
 
+from api import snapshots
+from ingridients import search
 from ingridients.models import Ingredient
 
 from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 
 DATA_ROOT = os.path.join(settings.BASE_DIR, 'data')
+READ_SIZE = 64 * 1024
+SEPARATORS = ' \t\r\n,'
+NAME_LENGTH = Ingredient._meta.get_field('name').max_length
+MEASUREMENT_UNIT_LENGTH = Ingredient._meta.get_field(
+    'measurement_unit').max_length
+
+
+def read_json(file):
+    decoder = json.JSONDecoder()
+    buffer = file.read(READ_SIZE).lstrip()
+    if not buffer.startswith('['):
+        raise ValueError('ожидается JSON-массив')
+    position = 1
+    while True:
+        while position < len(buffer) and buffer[position] in SEPARATORS:
+            position += 1
+        if position < len(buffer) and buffer[position] == ']':
+            return
+        try:
+            item, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            chunk = file.read(READ_SIZE)
+            if not chunk:
+                raise ValueError('неожиданный конец JSON-массива')
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        if isinstance(item, dict):
+            yield [item.get('name'), item.get('measurement_unit')]
+        else:
+            yield item
 
 
 class Command(BaseCommand):
+    help = 'Загружает ингредиенты из CSV или JSON файла'
 
     def add_arguments(self, parser):
         parser.add_argument('filename', default='ingredients.csv',
                             nargs='?', type=str)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Проверить загрузку и откатить изменения')
 
     def handle(self, *args, **options):
+        path = os.path.join(DATA_ROOT, options['filename'])
+        reader = read_json if path.endswith('.json') else csv.reader
+        batch_size = options['batch_size']
+        counts = {'inserted': 0, 'skipped': 0, 'invalid': 0}
         try:
-            with open(os.path.join(DATA_ROOT, options['filename']),
-                      'r', encoding='utf-8') as f:
-                data = csv.reader(f)
-                for row in data:
-                    name, measurement_unit = row
-                    Ingredient.objects.get_or_create(
-                        name=name, measurement_unit=measurement_unit
-                    )
-                self.stdout.write(
-                    self.style.SUCCESS('Ингредиенты загружены ')
-                )
+            with open(path, 'r', encoding='utf-8', newline='') as f, \
+                    transaction.atomic():
+                before = Ingredient.objects.count()
+                batch = {}
+                valid = 0
+                for row in reader(f):
+                    ingredient = self.clean(row)
+                    if ingredient is None:
+                        counts['invalid'] += 1
+                        continue
+                    valid += 1
+                    batch[ingredient] = None
+                    if len(batch) >= batch_size:
+                        self.save(batch)
+                        batch = {}
+                self.save(batch)
+                counts['inserted'] = Ingredient.objects.count() - before
+                counts['skipped'] = valid - counts['inserted']
+                if options['dry_run']:
+                    transaction.set_rollback(True)
         except FileNotFoundError:
             raise CommandError('Не найден файл ingredients')
+        except (ValueError, csv.Error) as error:
+            raise CommandError(f'Ошибка чтения файла: {error}')
+        if not options['dry_run'] and counts['inserted']:
+            search.invalidate()
+            snapshots.invalidate()
+        self.stdout.write(self.style.SUCCESS(
+            '{}Ингредиенты загружены: добавлено {inserted}, '
+            'пропущено {skipped}, с ошибками {invalid}'.format(
+                'Пробный запуск. ' if options['dry_run'] else '', **counts
+            )
+        ))
+
+    @staticmethod
+    def clean(row):
+        if not isinstance(row, (list, tuple)) or len(row) != 2:
+            return None
+        name, measurement_unit = row
+        if not isinstance(name, str) or not isinstance(measurement_unit, str):
+            return None
+        name, measurement_unit = name.strip(), measurement_unit.strip()
+        if (not name or len(name) > NAME_LENGTH
+                or not measurement_unit
+                or len(measurement_unit) > MEASUREMENT_UNIT_LENGTH):
+            return None
+        return name, measurement_unit
+
+    @staticmethod
+    def save(batch):
+        Ingredient.objects.bulk_create(
+            [Ingredient(name=name, measurement_unit=measurement_unit)
+             for name, measurement_unit in batch],
+            ignore_conflicts=True
+        )
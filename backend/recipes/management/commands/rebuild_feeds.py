@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipes.models import FeedEntry
+from recipes.services import fill_feed
+from users.models import Follow
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает ленты подписок из таблицы подписок'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            FeedEntry.objects.all().delete()
+            follows = Follow.objects.values_list('user', 'author')
+            for user_id, author_id in follows.iterator():
+                fill_feed(user_id, author_id)
+        self.stdout.write(self.style.SUCCESS(
+            f'Записей в лентах: {FeedEntry.objects.count()}'
+        ))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from recipes.models import (FavoriteRecipe, IngredientsAmount, Recipe,
+                            ShoppingCart,)
+from recipes.services import count_subquery
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает счётчики избранного, списков покупок '
+            'и ингредиентов у рецептов')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            drifted = list(Recipe.objects.annotate(
+                actual_favorites=count_subquery(FavoriteRecipe),
+                actual_shopcarts=count_subquery(ShoppingCart),
+                actual_ingredients=count_subquery(IngredientsAmount),
+            ).exclude(
+                favorites_count=F('actual_favorites'),
+                shopcarts_count=F('actual_shopcarts'),
+                ingredients_count=F('actual_ingredients'),
+            ).values_list('pk', flat=True))
+            Recipe.objects.filter(pk__in=drifted).update(
+                favorites_count=count_subquery(FavoriteRecipe),
+                shopcarts_count=count_subquery(ShoppingCart),
+                ingredients_count=count_subquery(IngredientsAmount),
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Счётчики исправлены у рецептов: {len(drifted)}'
+        ))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from recipes.models import Recipe
+from recipes.search import update_search_vectors
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает поисковые векторы всех рецептов'
+
+    def handle(self, *args, **options):
+        update_search_vectors(Recipe.objects.values('pk'))
+        self.stdout.write(self.style.SUCCESS('Поисковые векторы обновлены'))
@@ -11,10 +11,10 @@ class PatchModelMixin:
         )
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
-
         if getattr(instance, '_prefetched_objects_cache', None):
+            # Как в UpdateModelMixin из DRF: связи перечитываются после
+            # записи одним запросом на каждую.
             instance._prefetched_objects_cache = {}
-
         return Response(serializer.data)
 
     def perform_update(self, serializer):
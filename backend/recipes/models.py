@@ -1,13 +1,77 @@
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core import validators
 from django.db import models
+from django.db.models import Exists, F, OuterRef, Prefetch, Value, Window
+from django.db.models.functions import RowNumber
 
 from ingridients.models import Ingredient
 from tags.models import Tag
+from users.models import Follow
 
 User = get_user_model()
 
+IMAGE_RENDITIONS = {
+    'image_card': (480, 480),
+    'image_detail': (1200, 1200),
+}
+
+
+class SearchVectorIndex(GinIndex):
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        if schema_editor.connection.vendor != 'postgresql':
+            return models.Index.create_sql(
+                self, model, schema_editor, using=using, **kwargs
+            )
+        return super().create_sql(model, schema_editor, using, **kwargs)
+
+
+USER_FLAGS = ('is_favorited', 'is_in_shopping_cart', 'is_author_subscribed')
+
+
+class RecipeQuerySet(models.QuerySet):
+    def with_related(self, author=True, tags=True, ingredients=True):
+        queryset = self.select_related('author') if author else self
+        if tags:
+            queryset = queryset.prefetch_related(
+                Prefetch('tags', queryset=Tag.objects.only('pk'))
+            )
+        if ingredients:
+            queryset = queryset.prefetch_related('amounts')
+        return queryset
+
+    def with_user_flags(self, user, flags=USER_FLAGS):
+        if user.is_anonymous:
+            return self.annotate(**{flag: Value(False) for flag in flags})
+        annotations = {
+            'is_favorited': lambda: Exists(FavoriteRecipe.objects.filter(
+                user=user, recipe=OuterRef('pk')
+            )),
+            'is_in_shopping_cart': lambda: Exists(ShoppingCart.objects.filter(
+                user=user, recipe=OuterRef('pk')
+            )),
+            'is_author_subscribed': lambda: Exists(Follow.objects.filter(
+                user=user, author=OuterRef('author')
+            )),
+        }
+        return self.annotate(**{flag: annotations[flag]() for flag in flags})
+
+    def latest_by_author(self, authors, limit):
+        sql, params = self.filter(author__in=authors).annotate(
+            author_rank=Window(
+                RowNumber(),
+                partition_by=F('author'),
+                order_by=(F('pub_date').desc(), F('id').desc())
+            )
+        ).query.sql_with_params()
+        return self.raw(
+            f'SELECT * FROM ({sql}) AS ranked WHERE author_rank <= %s '
+            f'ORDER BY author_rank',
+            (*params, limit)
+        )
+
 
 class Recipe(models.Model):
     author = models.ForeignKey(
@@ -26,6 +90,18 @@ class Recipe(models.Model):
         upload_to='recipe_images/%Y/%m/%d',
         default='static/images/DefaultCardImg.png'
     )
+    image_card = models.ImageField(
+        'Картинка для карточки',
+        upload_to='recipe_images/renditions/%Y/%m/%d',
+        blank=True,
+        editable=False
+    )
+    image_detail = models.ImageField(
+        'Картинка для страницы рецепта',
+        upload_to='recipe_images/renditions/%Y/%m/%d',
+        blank=True,
+        editable=False
+    )
     text = models.TextField(
         'Текстовое описание',
         max_length=1000
@@ -55,15 +131,65 @@ class Recipe(models.Model):
         auto_now_add=True,
         db_index=True
     )
+    updated_at = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True
+    )
+    favorites_count = models.PositiveIntegerField(
+        'В избранном',
+        default=0,
+        editable=False
+    )
+    shopcarts_count = models.PositiveIntegerField(
+        'В списке покупок',
+        default=0,
+        editable=False
+    )
+    ingredients_count = models.PositiveSmallIntegerField(
+        'Ингредиентов',
+        default=0,
+        editable=False
+    )
+    search_vector = SearchVectorField(
+        'Поисковый вектор',
+        null=True,
+        editable=False
+    )
+
+    objects = RecipeQuerySet.as_manager()
+
+    denormalized_fields = ('favorites_count', 'shopcarts_count',
+                           'ingredients_count', 'search_vector')
 
     class Meta:
         ordering = ('-pub_date',)
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'],
+                name='recipe_pub_date_id_idx'
+            ),
+            SearchVectorIndex(
+                fields=['search_vector'],
+                name='recipe_search_vector_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name[:settings.NAME_PREVIEW]
 
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.denormalized_fields
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
 
 class IngredientsAmount(models.Model):
     recipe = models.ForeignKey(
@@ -93,6 +219,16 @@ class IngredientsAmount(models.Model):
     class Meta:
         verbose_name = 'Количество ингредиента'
         verbose_name_plural = 'Количество ингредиентов'
+        indexes = [
+            models.Index(
+                fields=['recipe', 'ingredient', 'amount'],
+                name='recipe_ingredient_amount_idx'
+            ),
+            models.Index(
+                fields=['ingredient', 'recipe'],
+                name='ingredient_recipe_idx'
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['recipe', 'ingredient'],
@@ -160,3 +296,38 @@ class ShoppingCart(models.Model):
 
     def __str__(self):
         return f'{self.recipe} в списке покупок у {self.user}'
+
+
+class FeedEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Подписчик',
+        related_name='feed_entries'
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        verbose_name='Рецепт',
+        related_name='feed_entries'
+    )
+    pub_date = models.DateTimeField('Дата публикации')
+
+    class Meta:
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Лента подписок'
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-recipe'],
+                name='feed_user_pub_date_idx'
+            )
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'recipe'],
+                name='unique_feed_entry'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.recipe} в ленте у {self.user}'
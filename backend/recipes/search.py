@@ -0,0 +1,77 @@
+import re
+
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            SearchVector,)
+from django.db import connection
+from django.db.models import (Case, Exists, F, OuterRef, Q, Subquery,
+                              TextField, Value, When,)
+from django.db.models.functions import Coalesce
+
+from .models import IngredientsAmount, Recipe
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def is_postgresql():
+    return connection.vendor == 'postgresql'
+
+
+def search(queryset, query):
+    if is_postgresql():
+        search_query = SearchQuery(
+            query, config=settings.RECIPE_SEARCH_CONFIG,
+            search_type='websearch'
+        )
+        return queryset.filter(search_vector=search_query).annotate(
+            rank=SearchRank(F('search_vector'), search_query)
+        ).order_by('-rank', '-pub_date')
+    return substring_search(queryset, query)
+
+
+def substring_search(queryset, query):
+    # Без PostgreSQL полнотекстового поиска нет (SQLite в разработке и
+    # тестах): каждое слово ищется подстрокой в названии, описании или
+    # ингредиентах, рецепты с совпадением в названии идут первыми.
+    tokens = TOKEN_RE.findall(query)
+    if not tokens:
+        return queryset.none()
+    matches = Q()
+    in_name = Q()
+    for token in tokens:
+        in_name &= Q(name__icontains=token)
+        matches &= (
+            Q(name__icontains=token)
+            | Q(text__icontains=token)
+            | Exists(IngredientsAmount.objects.filter(
+                recipe=OuterRef('pk'), ingredient__name__icontains=token
+            ))
+        )
+    return queryset.filter(matches).annotate(
+        name_match=Case(When(in_name, then=Value(0)), default=Value(1))
+    ).order_by('name_match', '-pub_date')
+
+
+def update_search_vectors(recipe_ids):
+    if not is_postgresql():
+        return
+    config = settings.RECIPE_SEARCH_CONFIG
+    ingredient_names = Subquery(
+        IngredientsAmount.objects.filter(
+            recipe=OuterRef('pk')
+        ).values('recipe').annotate(
+            names=StringAgg('ingredient__name', ' ')
+        ).values('names')
+    )
+    Recipe.objects.filter(pk__in=recipe_ids).update(
+        search_vector=(
+            SearchVector('name', weight='A', config=config)
+            + SearchVector(
+                Coalesce(ingredient_names, Value(''),
+                         output_field=TextField()),
+                weight='B', config=config
+            )
+            + SearchVector('text', weight='C', config=config)
+        )
+    )
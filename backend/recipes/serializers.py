@@ -1,14 +1,57 @@
+from collections import Counter
+
+from django.db import transaction
 from ingridients.models import Ingredient
 from rest_framework import exceptions, serializers
 
+from api import snapshots
+from api.fieldsets import SparseFieldsetMixin
+from api.images import schedule_renditions
 from backend.api.utils import Base64ImageField
-from recipes.models import (FavoriteRecipe, IngredientsAmount, Recipe,
-                            ShoppingCart,)
+from recipes.models import (IMAGE_RENDITIONS, FavoriteRecipe,
+                            IngredientsAmount, Recipe, ShoppingCart,)
+from recipes.signals import ingredients_changed
 from tags.models import Tag
 from tags.serializers import TagSerializer
 from users.serializers import CustomUserSerializer
 
 
+RECIPES_BULK_LIMIT = 100
+
+
+def get_dictionaries(context):
+    if 'dictionaries' not in context:
+        context['dictionaries'] = snapshots.get_snapshot()
+    return context['dictionaries']
+
+
+def lookup_dictionary(context, table, pk):
+    value = getattr(get_dictionaries(context), table)(pk)
+    if value is None and not context.get('dictionaries_refreshed'):
+        # Запись есть в базе, но снимок собран до её появления (поколение
+        # сменилось в другом процессе): перестраиваем его один раз на запрос.
+        context['dictionaries'] = snapshots.get_snapshot(
+            outdated=context['dictionaries']
+        )
+        context['dictionaries_refreshed'] = True
+        value = getattr(context['dictionaries'], table)(pk)
+    return value
+
+
+def get_duplicates(ids):
+    return [pk for pk, count in Counter(ids).items() if count > 1]
+
+
+def get_objects(model, ids):
+    objects = model.objects.in_bulk(ids)
+    missing = [pk for pk in ids if pk not in objects]
+    if missing:
+        raise exceptions.ValidationError(
+            f'Не найдены объекты с id: {", ".join(map(str, missing))}.'
+        )
+    return [objects[pk] for pk in ids]
+
+
 class RecipeSerializer(serializers.ModelSerializer):
     class Meta:
         model = Recipe
@@ -16,6 +59,15 @@ class RecipeSerializer(serializers.ModelSerializer):
         read_only_fields = ['__all__']
 
 
+class RecipeTagSerializer(TagSerializer):
+    def to_representation(self, instance):
+        tag = lookup_dictionary(self.context, 'tag', instance.pk)
+        if tag is None:
+            return super().to_representation(instance)
+        name, color, slug = tag
+        return {'id': instance.pk, 'name': name, 'color': color, 'slug': slug}
+
+
 class IngredientsAmountSerializer(serializers.ModelSerializer):
     id = serializers.ReadOnlyField(source='ingredient.id')
     name = serializers.ReadOnlyField(source='ingredient.name')
@@ -27,43 +79,111 @@ class IngredientsAmountSerializer(serializers.ModelSerializer):
         model = IngredientsAmount
         fields = ('id', 'name', 'measurement_unit', 'amount')
 
-
-class RecipeListSerializer(serializers.ModelSerializer):
+    def to_representation(self, instance):
+        ingredient = lookup_dictionary(
+            self.context, 'ingredient', instance.ingredient_id
+        )
+        if ingredient is None:
+            ingredient = (instance.ingredient.name,
+                          instance.ingredient.measurement_unit)
+        name, measurement_unit = ingredient
+        return {
+            'id': instance.ingredient_id,
+            'name': name,
+            'measurement_unit': measurement_unit,
+            'amount': instance.amount,
+        }
+
+
+class RecipeListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     author = CustomUserSerializer(read_only=True)
     image = Base64ImageField()
     ingredients = serializers.SerializerMethodField(read_only=True)
-    tags = TagSerializer(read_only=True, many=True)
+    tags = RecipeTagSerializer(read_only=True, many=True)
     is_favorited = serializers.SerializerMethodField(read_only=True)
     is_in_shopping_cart = serializers.SerializerMethodField(read_only=True)
+    images = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
         model = Recipe
         fields = ('id', 'tags', 'author', 'ingredients', 'is_favorited',
-                  'is_in_shopping_cart', 'name', 'image', 'text',
+                  'is_in_shopping_cart', 'name', 'image', 'images', 'text',
                   'cooking_time')
 
     def get_ingredients(self, obj):
-        queryset = IngredientsAmount.objects.filter(recipe=obj)
-        return IngredientsAmountSerializer(queryset, many=True).data
+        return IngredientsAmountSerializer(
+            obj.amounts.all(), many=True, context=self.context
+        ).data
 
     def get_is_favorited(self, obj):
+        if hasattr(obj, 'is_favorited'):
+            return obj.is_favorited
         user = self.context.get('request').user
         if user.is_anonymous:
             return False
         return obj.favorites.filter(user=user).exists()
 
     def get_is_in_shopping_cart(self, obj):
+        if hasattr(obj, 'is_in_shopping_cart'):
+            return obj.is_in_shopping_cart
         user = self.context.get('request').user
         if user.is_anonymous:
             return False
         return obj.shopcarts.filter(user=user).exists()
 
+    def get_images(self, obj):
+        original = self.get_image_url(obj.image)
+        return {
+            'card': self.get_image_url(obj.image_card) or original,
+            'detail': self.get_image_url(obj.image_detail) or original,
+            'original': original,
+        }
+
+    def get_image_url(self, image):
+        if not image:
+            return None
+        request = self.context.get('request')
+        if request is None:
+            return image.url
+        return request.build_absolute_uri(image.url)
+
+    def to_representation(self, instance):
+        if hasattr(instance, 'is_author_subscribed'):
+            instance.author.is_subscribed = instance.is_author_subscribed
+        data = super().to_representation(instance)
+        rendition = self.context.get('image_rendition')
+        if rendition and 'image' in data:
+            images = data.get('images') or self.get_images(instance)
+            data['image'] = images[rendition]
+        return data
+
+
+class RecipeCardSerializer(RecipeListSerializer):
+    class Meta(RecipeListSerializer.Meta):
+        fields = ('id', 'tags', 'author', 'is_favorited',
+                  'is_in_shopping_cart', 'name', 'image', 'cooking_time')
+
+
+class CookableRecipeSerializer(RecipeListSerializer):
+    coverage = serializers.FloatField(read_only=True)
+    matched_ingredients = serializers.IntegerField(
+        source='matched_count', read_only=True
+    )
+
+    class Meta(RecipeListSerializer.Meta):
+        fields = RecipeListSerializer.Meta.fields + (
+            'coverage', 'matched_ingredients'
+        )
+
 
 class AddIngredientSerializer(serializers.ModelSerializer):
-    id = serializers.PrimaryKeyRelatedField(
-        queryset=Ingredient.objects.all()
+    id = serializers.IntegerField(min_value=1)
+    amount = serializers.IntegerField(
+        min_value=1,
+        error_messages={
+            'min_value': 'Количество ингредиентов не должно быть меньше 1'
+        }
     )
-    amount = serializers.IntegerField()
 
     class Meta:
         model = IngredientsAmount
@@ -74,9 +194,7 @@ class RecipeCreateUpdateSerializer(serializers.ModelSerializer):
     image = Base64ImageField()
     author = CustomUserSerializer(read_only=True)
     ingredients = AddIngredientSerializer(many=True)
-    tags = serializers.PrimaryKeyRelatedField(
-        queryset=Tag.objects.all(), many=True
-    )
+    tags = serializers.ListField(child=serializers.IntegerField(min_value=1))
     cooking_time = serializers.IntegerField()
 
     class Meta:
@@ -87,26 +205,28 @@ class RecipeCreateUpdateSerializer(serializers.ModelSerializer):
     def validate_tags(self, tags):
         if not tags:
             raise exceptions.ValidationError('Выберите тэг.')
-        tag_list = []
-        for tag in tags:
-            if tag in tag_list:
-                exceptions.ValidationError('Тэги должны быть уникальными.')
-            tag_list.append(tag)
-
-        return tags
+        duplicates = get_duplicates(tags)
+        if duplicates:
+            raise exceptions.ValidationError(
+                f'Тэги должны быть уникальными: '
+                f'{", ".join(map(str, duplicates))}.'
+            )
+        return get_objects(Tag, tags)
 
     def validate_ingredients(self, ingredients):
         if not ingredients:
             raise exceptions.ValidationError(
                 'Количество ингредиента не должно быть меньше 1'
             )
-
-        ingredients_id_list = [ingredient['id'] for ingredient in ingredients]
-        for ingredient_id in ingredients_id_list:
-            if ingredients_id_list.count(ingredient_id) > 1:
-                raise exceptions.ValidationError(
-                    'Ингредиенты должны быть уникальными.'
-                )
+        ids = [ingredient['id'] for ingredient in ingredients]
+        duplicates = get_duplicates(ids)
+        if duplicates:
+            raise exceptions.ValidationError(
+                f'Ингредиенты должны быть уникальными: '
+                f'{", ".join(map(str, duplicates))}.'
+            )
+        for ingredient, obj in zip(ingredients, get_objects(Ingredient, ids)):
+            ingredient['id'] = obj
         return ingredients
 
     def validate_cooking_time(self, cooking_time):
@@ -126,6 +246,7 @@ class RecipeCreateUpdateSerializer(serializers.ModelSerializer):
             ) for ingredient in ingredients
         ]
         IngredientsAmount.objects.bulk_create(ingredients)
+        ingredients_changed.send(sender=Recipe, recipe=recipe)
 
     def create(self, validated_data):
         tags = validated_data.pop('tags')
@@ -133,21 +254,64 @@ class RecipeCreateUpdateSerializer(serializers.ModelSerializer):
         recipe = Recipe.objects.create(**validated_data)
         recipe.tags.set(tags)
         self.create_ingredients(ingredients, recipe)
+        schedule_renditions(recipe, 'image', IMAGE_RENDITIONS)
         return recipe
 
-    def update(self, recipe, validated_data):
-        tags = validated_data.get('tags')
-        ingredients = validated_data.get('ingredients')
-
-        if tags:
-            recipe.tags.clear()
-            recipe.tags.set(tags)
+    @staticmethod
+    def update_tags(recipe, tags):
+        current = {tag.pk: tag for tag in recipe.tags.all()}
+        new = {tag.pk: tag for tag in tags}
+        removed = current.keys() - new.keys()
+        added = new.keys() - current.keys()
+        if removed:
+            recipe.tags.remove(*removed)
+        if added:
+            recipe.tags.add(*added)
 
-        if ingredients:
-            recipe.ingredients.clear()
-            self.create_ingredients(ingredients, recipe)
+    @staticmethod
+    def update_ingredients(recipe, ingredients):
+        current = {
+            amount.ingredient_id: amount for amount in recipe.amounts.all()
+        }
+        created = []
+        changed = []
+        for ingredient in ingredients:
+            amount = current.pop(ingredient['id'].pk, None)
+            if amount is None:
+                created.append(IngredientsAmount(
+                    recipe=recipe,
+                    ingredient=ingredient['id'],
+                    amount=ingredient['amount']
+                ))
+                continue
+            if amount.amount != ingredient['amount']:
+                amount.amount = ingredient['amount']
+                changed.append(amount)
+        if current:
+            IngredientsAmount.objects.filter(
+                pk__in=[amount.pk for amount in current.values()]
+            ).delete()
+        if changed:
+            IngredientsAmount.objects.bulk_update(changed, ['amount'])
+        if created:
+            IngredientsAmount.objects.bulk_create(created)
+        if current or changed or created:
+            ingredients_changed.send(sender=Recipe, recipe=recipe)
 
-        return super().update(recipe, validated_data)
+    def update(self, recipe, validated_data):
+        tags = validated_data.pop('tags', None)
+        ingredients = validated_data.pop('ingredients', None)
+
+        with transaction.atomic():
+            if tags is not None:
+                self.update_tags(recipe, tags)
+            if ingredients is not None:
+                self.update_ingredients(recipe, ingredients)
+            recipe = super().update(recipe, validated_data)
+
+        if 'image' in validated_data:
+            schedule_renditions(recipe, 'image', IMAGE_RENDITIONS)
+        return recipe
 
     def to_representation(self, instance):
         request = self.context.get('request')
@@ -155,6 +319,17 @@ class RecipeCreateUpdateSerializer(serializers.ModelSerializer):
         return RecipeListSerializer(instance, context=context).data
 
 
+class RecipeIdsSerializer(serializers.Serializer):
+    recipes = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=RECIPES_BULK_LIMIT
+    )
+
+    def validate_recipes(self, recipes):
+        return list(dict.fromkeys(recipes))
+
+
 class FavoriteRecipeSerializer(serializers.ModelSerializer):
     class Meta:
         model = FavoriteRecipe
@@ -0,0 +1,140 @@
+from django.db import transaction
+from django.db.models import (Count, ExpressionWrapper, F, FloatField,
+                              OuterRef, Subquery, Sum, Value,)
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.utils import timezone
+
+from users.models import Follow
+from .models import (FavoriteRecipe, FeedEntry, IngredientsAmount, Recipe,
+                     ShoppingCart,)
+
+FEED_BATCH_SIZE = 1000
+
+COUNTER_FIELDS = {
+    FavoriteRecipe: 'favorites_count',
+    ShoppingCart: 'shopcarts_count',
+}
+
+
+def count_subquery(model):
+    return Coalesce(Subquery(
+        model.objects.filter(recipe=OuterRef('pk')).values('recipe').annotate(
+            total=Count('id')
+        ).values('total')
+    ), Value(0))
+
+
+def update_ingredients_count(recipe_ids):
+    Recipe.objects.filter(pk__in=recipe_ids).update(
+        ingredients_count=count_subquery(IngredientsAmount)
+    )
+
+
+def touch_recipes(recipe_ids):
+    Recipe.objects.filter(pk__in=recipe_ids).update(updated_at=timezone.now())
+
+
+def rank_by_coverage(queryset, ingredient_ids):
+    return queryset.filter(
+        amounts__ingredient__in=ingredient_ids
+    ).annotate(
+        matched_count=Count('amounts', distinct=True)
+    ).annotate(
+        coverage=ExpressionWrapper(
+            Cast('matched_count', FloatField())
+            / NullIf('ingredients_count', 0),
+            output_field=FloatField()
+        )
+    ).order_by('-coverage', '-matched_count', '-pub_date', '-id')
+
+
+def get_shopping_cart_ingredients(user):
+    return IngredientsAmount.objects.filter(
+        recipe__shopcarts__user=user
+    ).values_list(
+        'ingredient__name', 'ingredient__measurement_unit'
+    ).annotate(
+        Sum('amount')
+    ).order_by('ingredient__name', 'ingredient__measurement_unit')
+
+
+def change_counter(model, recipe_ids, delta):
+    field = COUNTER_FIELDS[model]
+    recipes = Recipe.objects.filter(pk__in=recipe_ids)
+    if delta < 0:
+        recipes = recipes.filter(**{f'{field}__gte': -delta})
+    recipes.update(**{field: F(field) + delta})
+
+
+def lock_recipes(recipe_ids):
+    return set(Recipe.objects.select_for_update().filter(
+        pk__in=recipe_ids
+    ).order_by('pk').values_list('pk', flat=True))
+
+
+def add_relations(model, user, recipe_ids):
+    with transaction.atomic():
+        found = lock_recipes(recipe_ids)
+        existing = set(model.objects.filter(
+            user=user, recipe__in=found
+        ).values_list('recipe_id', flat=True))
+        added = [
+            pk for pk in recipe_ids if pk in found and pk not in existing
+        ]
+        model.objects.bulk_create(
+            model(user=user, recipe_id=pk) for pk in added
+        )
+        change_counter(model, added, 1)
+    return {
+        pk: 'exists' if pk in existing else
+        'added' if pk in found else 'not_found'
+        for pk in recipe_ids
+    }
+
+
+def remove_relations(model, user, recipe_ids=None):
+    relations = model.objects.filter(user=user)
+    if recipe_ids is not None:
+        relations = relations.filter(recipe__in=recipe_ids)
+    with transaction.atomic():
+        removed = set(relations.select_for_update().values_list(
+            'recipe_id', flat=True
+        ))
+        if removed:
+            relations.delete()
+            change_counter(model, removed, -1)
+    if recipe_ids is None:
+        return dict.fromkeys(removed, 'removed')
+    return {
+        pk: 'removed' if pk in removed else 'absent' for pk in recipe_ids
+    }
+
+
+def fan_out_recipe(recipe):
+    followers = Follow.objects.filter(
+        author=recipe.author_id
+    ).values_list('user', flat=True)
+    FeedEntry.objects.bulk_create(
+        (FeedEntry(user_id=user_id, recipe=recipe, pub_date=recipe.pub_date)
+         for user_id in followers.iterator()),
+        batch_size=FEED_BATCH_SIZE,
+        ignore_conflicts=True
+    )
+
+
+def fill_feed(user_id, author_id):
+    recipes = Recipe.objects.filter(
+        author=author_id
+    ).values_list('id', 'pub_date')
+    FeedEntry.objects.bulk_create(
+        (FeedEntry(user_id=user_id, recipe_id=recipe_id, pub_date=pub_date)
+         for recipe_id, pub_date in recipes.iterator()),
+        batch_size=FEED_BATCH_SIZE,
+        ignore_conflicts=True
+    )
+
+
+def clear_feed(user_id, author_id):
+    FeedEntry.objects.filter(
+        user=user_id, recipe__author=author_id
+    ).delete()
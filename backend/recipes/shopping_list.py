@@ -0,0 +1,189 @@
+import abc
+import asyncio
+import copy
+import csv
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from fpdf import FPDF
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+
+FONT_FAMILY = 'Teddy'
+FONT_PATH = os.path.join(settings.BASE_DIR, 'recipes', 'fonts',
+                         'teddy-bear.ttf')
+TITLE = 'Список покупок'
+CHUNK_SIZE = 64 * 1024
+RENDERERS = []
+
+_executor = None
+
+
+class ShoppingListPDF(FPDF):
+    parsed_fonts = {}
+
+    def add_font(self, family=None, style='', fname=None):
+        fontkey = f'{family.lower()}{style}'
+        if fontkey not in self.parsed_fonts:
+            super().add_font(family, style, fname)
+            self.parsed_fonts[fontkey] = self.fonts.pop(fontkey)
+        font = self.parsed_fonts[fontkey]
+        self.fonts[fontkey] = {
+            **font,
+            'i': len(self.fonts) + 1,
+            'subset': copy.deepcopy(font['subset']),
+        }
+
+
+def render_pdf(ingredients):
+    pdf = ShoppingListPDF()
+    pdf.add_page()
+    pdf.add_font(FONT_FAMILY, '', FONT_PATH)
+    pdf.set_font(FONT_FAMILY, size=14)
+    pdf.cell(txt=TITLE, center=True)
+    pdf.ln(8)
+    for i, (name, unit, amount) in enumerate(ingredients):
+        pdf.cell(40, 10, f'{i + 1}) {name} - {amount} {unit}')
+        pdf.ln()
+    return pdf.output()
+
+
+def get_pdf(ingredients):
+    ingredients = list(ingredients)
+    key = 'shopping_list:pdf:' + hashlib.sha256(
+        json.dumps(ingredients, ensure_ascii=False).encode()
+    ).hexdigest()
+    content = cache.get(key)
+    if content is None:
+        content = render_pdf(ingredients)
+        cache.set(key, content, settings.SHOPPING_LIST_CACHE_TIMEOUT)
+    return content
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.PDF_RENDER_WORKERS,
+            thread_name_prefix='shopping-list-pdf'
+        )
+    return _executor
+
+
+def iter_rows(ingredients):
+    if isinstance(ingredients, QuerySet):
+        return ingredients.iterator()
+    return iter(ingredients)
+
+
+def iter_chunks(content, chunk_size=CHUNK_SIZE):
+    view = memoryview(content)
+    for start in range(0, len(view), chunk_size):
+        yield view[start:start + chunk_size]
+
+
+def register(renderer_class):
+    if renderer_class.__abstractmethods__:
+        raise TypeError(
+            f'{renderer_class.__name__} не реализует '
+            f'{", ".join(sorted(renderer_class.__abstractmethods__))}'
+        )
+    RENDERERS.append(renderer_class)
+    return renderer_class
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+class ShoppingListRenderer(abc.ABC, BaseRenderer):
+    @abc.abstractmethod
+    def stream(self, ingredients):
+        pass
+
+    async def astream(self, ingredients):
+        return self.stream(ingredients)
+
+    def attachment(self, content):
+        response = StreamingHttpResponse(
+            content,
+            content_type=(f'{self.media_type}; charset={self.charset}'
+                          if self.charset else self.media_type)
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="shopping_cart.{self.format}"')
+        return response
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        renderer = JSONRenderer()
+        renderer_context['response']['Content-Type'] = renderer.media_type
+        return renderer.render(data, renderer.media_type, renderer_context)
+
+
+@register
+class PDFRenderer(ShoppingListRenderer):
+    media_type = 'application/pdf'
+    format = 'pdf'
+    charset = None
+
+    def stream(self, ingredients):
+        return get_pdf(ingredients)
+
+    async def astream(self, ingredients):
+        return await asyncio.get_running_loop().run_in_executor(
+            get_executor(), get_pdf, ingredients
+        )
+
+    def attachment(self, content):
+        response = super().attachment(iter_chunks(content))
+        response['Content-Length'] = len(content)
+        return response
+
+
+@register
+class TextRenderer(ShoppingListRenderer):
+    media_type = 'text/plain'
+    format = 'txt'
+    charset = 'utf-8'
+
+    def stream(self, ingredients):
+        yield f'{TITLE}\n\n'
+        for i, (name, unit, amount) in enumerate(iter_rows(ingredients)):
+            yield f'{i + 1}) {name} - {amount} {unit}\n'
+
+
+@register
+class CSVRenderer(ShoppingListRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def stream(self, ingredients):
+        writer = csv.writer(Echo())
+        yield writer.writerow(('name', 'measurement_unit', 'amount'))
+        for row in iter_rows(ingredients):
+            yield writer.writerow(row)
+
+
+@register
+class JSONListRenderer(ShoppingListRenderer):
+    media_type = 'application/json'
+    format = 'json'
+    charset = 'utf-8'
+
+    def stream(self, ingredients):
+        separator = '['
+        for name, unit, amount in iter_rows(ingredients):
+            yield separator + json.dumps(
+                {'name': name, 'measurement_unit': unit, 'amount': amount},
+                ensure_ascii=False
+            )
+            separator = ',\n'
+        yield ']' if separator == ',\n' else '[]'
@@ -0,0 +1,108 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete,)
+from django.dispatch import Signal, receiver
+
+from api import snapshots
+from api.images import delete_renditions, renditions_ready
+from ingridients.models import Ingredient
+from tags.models import Tag
+from . import cache, search
+from .models import IMAGE_RENDITIONS, IngredientsAmount, Recipe
+from users.models import Follow
+from .services import (COUNTER_FIELDS, change_counter, clear_feed,
+                       fan_out_recipe, fill_feed, touch_recipes,
+                       update_ingredients_count,)
+
+User = get_user_model()
+
+ingredients_changed = Signal()
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def recipe_changed(sender, instance, **kwargs):
+    cache.invalidate_recipe(instance.pk)
+    search.update_search_vectors([instance.pk])
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    delete_renditions(instance, 'image', IMAGE_RENDITIONS)
+
+
+@receiver(renditions_ready, sender=Recipe)
+def recipe_renditions_ready(sender, instance, **kwargs):
+    cache.invalidate_recipe(instance.pk)
+    touch_recipes([instance.pk])
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def recipe_tags_changed(sender, instance, action, **kwargs):
+    if action.startswith('post_') and isinstance(instance, Recipe):
+        cache.invalidate_recipe(instance.pk)
+        touch_recipes([instance.pk])
+
+
+@receiver(post_save, sender=IngredientsAmount)
+@receiver(post_delete, sender=IngredientsAmount)
+def ingredients_amount_changed(sender, instance, **kwargs):
+    cache.invalidate_recipe(instance.recipe_id)
+    search.update_search_vectors([instance.recipe_id])
+    update_ingredients_count([instance.recipe_id])
+    touch_recipes([instance.recipe_id])
+
+
+@receiver(ingredients_changed, sender=Recipe)
+def recipe_ingredients_changed(sender, recipe, **kwargs):
+    cache.invalidate_recipe(recipe.pk)
+    search.update_search_vectors([recipe.pk])
+    update_ingredients_count([recipe.pk])
+    touch_recipes([recipe.pk])
+
+
+@receiver(post_save, sender=Ingredient)
+def ingredient_renamed(sender, instance, created, **kwargs):
+    if not created:
+        search.update_search_vectors(instance.amounts.values('recipe'))
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def dictionary_changed(sender, **kwargs):
+    snapshots.invalidate()
+    cache.invalidate_all()
+
+
+@receiver(post_save, sender=User)
+def author_changed(sender, created, update_fields=None, **kwargs):
+    if created or update_fields and set(update_fields) <= {'last_login'}:
+        return
+    cache.invalidate_all()
+
+
+@receiver(pre_delete, sender=User)
+def counted_relations_owner_deleted(sender, instance, **kwargs):
+    for model in COUNTER_FIELDS:
+        change_counter(model, model.objects.filter(
+            user=instance
+        ).values('recipe'), -1)
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_published(sender, instance, created, **kwargs):
+    if created:
+        fan_out_recipe(instance)
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, **kwargs):
+    if created:
+        fill_feed(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    clear_feed(instance.user_id, instance.author_id)
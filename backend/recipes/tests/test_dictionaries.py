@@ -0,0 +1,72 @@
+from unittest import mock
+
+from rest_framework.test import APITestCase
+
+from django.core.cache import cache
+from django.test import override_settings
+
+from api import snapshots
+from api.cache import get_generations
+from recipes import cache as recipe_cache
+from recipes.models import Recipe
+from tags.models import Tag
+from users.models import CustomUser
+
+
+class DictionarySnapshotTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = CustomUser.objects.create_user(
+            email='author@example.com', username='author', password='password'
+        )
+        cls.recipes = [
+            Recipe.objects.create(
+                author=author, name=f'recipe{i}', text='text', cooking_time=5
+            )
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.snapshot = snapshots.get_snapshot()
+
+    def create_tag_elsewhere(self):
+        # bulk_create не шлёт post_save: так тег появляется в другом
+        # процессе, а поколение в локальном кэше остаётся прежним.
+        tag, = Tag.objects.bulk_create([
+            Tag(name='new', color='#000000', slug='new')
+        ])
+        for recipe in self.recipes:
+            recipe.tags.through.objects.create(recipe=recipe, tag=tag)
+        return tag
+
+    def test_missing_tag_rebuilds_snapshot_once(self):
+        tag = self.create_tag_elsewhere()
+        with self.assertNumQueries(6):
+            response = self.client.get('/api/recipes/')
+        self.assertEqual(
+            [recipe['tags'] for recipe in response.data['results']],
+            [[{'id': tag.pk, 'name': 'new', 'color': '#000000',
+               'slug': 'new'}]] * len(self.recipes)
+        )
+        self.assertIsNot(snapshots.get_snapshot(), self.snapshot)
+
+    @override_settings(DICTIONARY_SNAPSHOT_MAX_AGE=60)
+    def test_snapshot_expires(self):
+        self.create_tag_elsewhere()
+        built_at = self.snapshot.built_at
+        with mock.patch('api.snapshots.time.time', return_value=built_at):
+            self.assertIs(snapshots.get_snapshot(), self.snapshot)
+        with mock.patch('api.snapshots.time.time',
+                        return_value=built_at + 60):
+            snapshot = snapshots.get_snapshot()
+        self.assertIsNot(snapshot, self.snapshot)
+        self.assertIn('new', snapshot.tag_ids)
+
+    def test_tag_change_invalidates_snapshot_and_recipes(self):
+        names = (snapshots.GENERATION, recipe_cache.RECIPES_GENERATION)
+        before = get_generations(*names)
+        Tag.objects.create(name='new', color='#000000', slug='new')
+        after = get_generations(*names)
+        self.assertTrue(all(new != old for new, old in zip(after, before)))
+        self.assertIn('new', snapshots.get_snapshot().tag_ids)
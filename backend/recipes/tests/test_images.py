@@ -0,0 +1,65 @@
+import shutil
+import tempfile
+from io import BytesIO
+
+from PIL import Image
+
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+
+from api.images import make_renditions
+from recipes.models import IMAGE_RENDITIONS, Recipe
+from users.models import CustomUser
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def make_image(name):
+    buffer = BytesIO()
+    Image.new('RGB', (16, 16), 'red').save(buffer, 'PNG')
+    return ContentFile(buffer.getvalue(), name=name)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class RenditionFilesTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        author = CustomUser.objects.create_user(
+            email='author@example.com', username='author', password='password'
+        )
+        self.recipe = Recipe.objects.create(
+            author=author, name='recipe', text='text', cooking_time=5,
+            image=make_image('first.png')
+        )
+        make_renditions(Recipe, self.recipe.pk, 'image', IMAGE_RENDITIONS)
+
+    def get_renditions(self):
+        recipe = Recipe.objects.get(pk=self.recipe.pk)
+        return [getattr(recipe, name) for name in IMAGE_RENDITIONS]
+
+    def assert_deleted(self, files):
+        for file in files:
+            self.assertTrue(file.name)
+            self.assertFalse(file.storage.exists(file.name), file.name)
+
+    def test_replaced_image_drops_old_renditions(self):
+        old = self.get_renditions()
+        recipe = Recipe.objects.get(pk=self.recipe.pk)
+        recipe.image = make_image('second.png')
+        recipe.save()
+
+        make_renditions(Recipe, recipe.pk, 'image', IMAGE_RENDITIONS)
+
+        self.assert_deleted(old)
+        for file in self.get_renditions():
+            self.assertTrue(file.storage.exists(file.name), file.name)
+
+    def test_deleted_recipe_drops_renditions(self):
+        renditions = self.get_renditions()
+        with self.captureOnCommitCallbacks(execute=True):
+            Recipe.objects.get(pk=self.recipe.pk).delete()
+        self.assert_deleted(renditions)
@@ -0,0 +1,62 @@
+from rest_framework.test import APITestCase
+
+from django.core.cache import cache
+
+from api import snapshots
+from ingridients.models import Ingredient
+from recipes.models import IngredientsAmount, Recipe
+from tags.models import Tag
+from users.models import CustomUser
+
+RECIPE_LIST_QUERIES = 4
+
+
+class RecipeListQueriesTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='user@example.com', username='user', password='password'
+        )
+        author = CustomUser.objects.create_user(
+            email='author@example.com', username='author', password='password'
+        )
+        tags = [
+            Tag.objects.create(name=f'tag{i}', color=f'#00000{i}',
+                               slug=f'tag{i}')
+            for i in range(2)
+        ]
+        ingredients = [
+            Ingredient.objects.create(name=f'ingredient{i}',
+                                      measurement_unit='г')
+            for i in range(3)
+        ]
+        for i in range(4):
+            recipe = Recipe.objects.create(
+                author=author, name=f'recipe{i}', text='text', cooking_time=5
+            )
+            recipe.tags.set(tags)
+            IngredientsAmount.objects.bulk_create(
+                IngredientsAmount(recipe=recipe, ingredient=ingredient,
+                                  amount=10)
+                for ingredient in ingredients
+            )
+
+    def setUp(self):
+        cache.clear()
+        snapshots.get_snapshot()
+
+    def assert_constant_queries(self):
+        for limit in (2, 4):
+            with self.subTest(limit=limit):
+                with self.assertNumQueries(RECIPE_LIST_QUERIES):
+                    response = self.client.get(
+                        '/api/recipes/', {'limit': limit}
+                    )
+                self.assertEqual(len(response.data['results']), limit)
+
+    def test_anonymous(self):
+        self.assert_constant_queries()
+
+    def test_authenticated(self):
+        self.client.force_authenticate(self.user)
+        self.assert_constant_queries()
@@ -0,0 +1,65 @@
+from rest_framework.test import APITestCase
+
+from recipes.models import FavoriteRecipe, Recipe, ShoppingCart
+from recipes.services import add_relations
+from users.models import CustomUser
+
+
+class CountedRelationsTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='user@example.com', username='user', password='password'
+        )
+        cls.recipes = [
+            Recipe.objects.create(
+                author=cls.user, name=f'recipe{i}', text='text',
+                cooking_time=5
+            )
+            for i in range(5)
+        ]
+        cls.recipe_ids = [recipe.pk for recipe in cls.recipes]
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def counters(self, field):
+        return list(Recipe.objects.filter(
+            pk__in=self.recipe_ids
+        ).order_by('pk').values_list(field, flat=True))
+
+    def test_clear_shopping_cart(self):
+        add_relations(ShoppingCart, self.user, self.recipe_ids)
+        self.assertEqual(self.counters('shopcarts_count'), [1] * 5)
+        # SAVEPOINT, SELECT ... FOR UPDATE, DELETE, UPDATE, RELEASE.
+        with self.assertNumQueries(5):
+            response = self.client.delete('/api/recipes/clear_shopping_cart/')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.counters('shopcarts_count'), [0] * 5)
+
+    def test_bulk_remove_favorites(self):
+        add_relations(FavoriteRecipe, self.user, self.recipe_ids)
+        with self.assertNumQueries(5):
+            response = self.client.delete(
+                '/api/recipes/favorite/',
+                {'recipes': self.recipe_ids[:3]}, format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.counters('favorites_count'), [0, 0, 0, 1, 1])
+
+    def test_single_add_and_remove(self):
+        url = f'/api/recipes/{self.recipe_ids[0]}/shopping_cart/'
+        self.assertEqual(self.client.post(url).status_code, 201)
+        self.assertEqual(self.client.post(url).status_code, 400)
+        self.assertEqual(self.counters('shopcarts_count')[0], 1)
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertEqual(self.client.delete(url).status_code, 400)
+        self.assertEqual(self.counters('shopcarts_count')[0], 0)
+
+    def test_deleting_user_releases_counters(self):
+        other = CustomUser.objects.create_user(
+            email='other@example.com', username='other', password='password'
+        )
+        add_relations(FavoriteRecipe, other, self.recipe_ids[:2])
+        other.delete()
+        self.assertEqual(self.counters('favorites_count'), [0] * 5)
@@ -0,0 +1,42 @@
+from django.test import TestCase
+
+from ingridients.models import Ingredient
+from recipes.models import IngredientsAmount, Recipe
+from recipes.search import substring_search
+from users.models import CustomUser
+
+
+class SubstringSearchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = CustomUser.objects.create_user(
+            email='author@example.com', username='author', password='password'
+        )
+
+        def create(name, text):
+            return Recipe.objects.create(
+                author=author, name=name, text=text, cooking_time=5
+            )
+
+        cls.soup = create('Tomato soup', 'Hot')
+        cls.salad = create('Salad', 'Tomato and cucumber')
+        cls.pasta = create('Pasta', 'Boil water')
+        basil = Ingredient.objects.create(name='Basil', measurement_unit='g')
+        IngredientsAmount.objects.create(
+            recipe=cls.pasta, ingredient=basil, amount=5
+        )
+
+    def search(self, query):
+        return list(substring_search(Recipe.objects.all(), query))
+
+    def test_name_matches_come_first(self):
+        self.assertEqual(self.search('tomato'), [self.soup, self.salad])
+
+    def test_ingredient_names_are_searched(self):
+        self.assertEqual(self.search('basil'), [self.pasta])
+
+    def test_every_word_must_match(self):
+        self.assertEqual(self.search('tomato cucumber'), [self.salad])
+
+    def test_query_without_words_finds_nothing(self):
+        self.assertEqual(self.search('!!'), [])
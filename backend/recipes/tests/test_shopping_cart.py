@@ -0,0 +1,62 @@
+from django.db import connection, transaction
+from django.test import TestCase
+
+from ingridients.models import Ingredient
+from recipes.models import IngredientsAmount, Recipe, ShoppingCart
+from recipes.services import get_shopping_cart_ingredients
+from users.models import CustomUser
+
+FULL_SCAN = {
+    'postgresql': 'Seq Scan on {}',
+    'sqlite': 'SCAN {}',
+}
+
+
+class ShoppingCartIngredientsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='user@example.com', username='user', password='password'
+        )
+        other = CustomUser.objects.create_user(
+            email='other@example.com', username='other', password='password'
+        )
+        flour = Ingredient.objects.create(name='мука', measurement_unit='г')
+        salt = Ingredient.objects.create(name='соль', measurement_unit='г')
+        recipes = [
+            Recipe.objects.create(
+                author=other, name=f'recipe{i}', text='text', cooking_time=5
+            )
+            for i in range(3)
+        ]
+        IngredientsAmount.objects.bulk_create([
+            IngredientsAmount(recipe=recipes[0], ingredient=flour,
+                              amount=200),
+            IngredientsAmount(recipe=recipes[0], ingredient=salt, amount=5),
+            IngredientsAmount(recipe=recipes[1], ingredient=flour,
+                              amount=200),
+            IngredientsAmount(recipe=recipes[2], ingredient=flour,
+                              amount=300),
+        ])
+        ShoppingCart.objects.create(user=cls.user, recipe=recipes[0])
+        ShoppingCart.objects.create(user=cls.user, recipe=recipes[1])
+        ShoppingCart.objects.create(user=other, recipe=recipes[2])
+
+    def test_equal_amounts_are_summed(self):
+        with self.assertNumQueries(1):
+            rows = list(get_shopping_cart_ingredients(self.user))
+        self.assertEqual(rows, [('мука', 'г', 400), ('соль', 'г', 5)])
+
+    def test_plan_uses_indexes(self):
+        if connection.vendor not in FULL_SCAN:
+            self.skipTest(f'No plan check for {connection.vendor}')
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+            plan = get_shopping_cart_ingredients(self.user).explain()
+        for model in (ShoppingCart, IngredientsAmount):
+            self.assertNotIn(
+                FULL_SCAN[connection.vendor].format(model._meta.db_table),
+                plan
+            )
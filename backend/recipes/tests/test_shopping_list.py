@@ -0,0 +1,16 @@
+from django.test import SimpleTestCase
+
+from recipes import shopping_list
+
+
+class RegisterTest(SimpleTestCase):
+    def test_renderer_without_stream_is_rejected(self):
+        with self.assertRaisesMessage(TypeError, 'stream'):
+            @shopping_list.register
+            class XMLRenderer(shopping_list.ShoppingListRenderer):
+                media_type = 'application/xml'
+                format = 'xml'
+
+        self.assertNotIn('xml', [
+            renderer.format for renderer in shopping_list.RENDERERS
+        ])
@@ -1,35 +1,159 @@
-from fpdf import FPDF
+from functools import partial
+
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import permissions, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import OrderingFilter
 from rest_framework.response import Response
 
-from django.db.models import Sum
-from django.http import HttpResponse
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 
-from backend.api.paginations import LimitPagination
+from api.conditional import ConditionalGetMixin
+from api.fieldsets import Fieldset
+from api.replicas import ReplicaReadMixin
+from backend.api.paginations import LimitPagination, PubDateCursorPagination
 from backend.api.permissions import AuthorStaffOrReadOnly
+from . import cache, shopping_list
 from .filters import RecipeFilter
 from .mixins import CreateRetrievListPatchDestroyViewSet
-from .models import IngredientsAmount, Recipe
-from .serializers import (FavoriteRecipeSerializer,
-                          RecipeCreateUpdateSerializer, RecipeListSerializer,
+from .models import FavoriteRecipe, Recipe, ShoppingCart
+from .serializers import (CookableRecipeSerializer, FavoriteRecipeSerializer,
+                          RecipeCardSerializer, RecipeCreateUpdateSerializer,
+                          RecipeIdsSerializer, RecipeListSerializer,
                           ShoppingCartSerializer,)
+from .services import (add_relations, change_counter,
+                       get_shopping_cart_ingredients, lock_recipes,
+                       rank_by_coverage, remove_relations,)
+
+CARD_VARIANT = 'card'
+
 
+def get_ingredient_ids(request):
+    values = ','.join(request.query_params.getlist('ingredients'))
+    try:
+        ids = {int(value) for value in values.split(',') if value.strip()}
+    except ValueError:
+        raise ValidationError(
+            {'ingredients': 'Укажите id ингредиентов через запятую'}
+        )
+    if not ids:
+        raise ValidationError(
+            {'ingredients': 'Укажите хотя бы один ингредиент'}
+        )
+    return ids
 
-class RecipeViewSet(CreateRetrievListPatchDestroyViewSet):
-    queryset = Recipe.objects.all()
-    filter_backends = (DjangoFilterBackend,)
+
+class RecipeViewSet(ReplicaReadMixin, ConditionalGetMixin,
+                    CreateRetrievListPatchDestroyViewSet):
+    filter_backends = (DjangoFilterBackend, OrderingFilter)
     filterset_class = RecipeFilter
+    ordering_fields = ('pub_date', 'favorites_count', 'shopcarts_count')
     permission_classes = [AuthorStaffOrReadOnly]
     pagination_class = LimitPagination
+    vary_headers = ('Authorization',)
+    replica_actions = ('list',)
+
+    def get_queryset(self):
+        queryset = Recipe.objects.defer('search_vector')
+        user = self.request.user
+        if self.request.method not in permissions.SAFE_METHODS:
+            return queryset.with_related().with_user_flags(user)
+        fields = self.get_serializer_class().Meta.fields
+        fieldset = Fieldset.from_request(self.request)
+
+        def wanted(name):
+            return name in fields and fieldset.keeps(name)
+
+        if not wanted('text'):
+            queryset = queryset.defer('text')
+        flags = [
+            flag for flag in ('is_favorited', 'is_in_shopping_cart')
+            if wanted(flag)
+        ]
+        if 'author' in fields and fieldset.keeps_nested(
+            'author', 'is_subscribed'
+        ):
+            flags.append('is_author_subscribed')
+        return queryset.with_related(
+            author=wanted('author'), tags=wanted('tags'),
+            ingredients=wanted('ingredients')
+        ).with_user_flags(user, flags)
+
+    def uses_replica(self, request):
+        return (
+            super().uses_replica(request)
+            and request.user.is_anonymous
+            and not cache.is_cacheable(request)
+        )
 
     def get_serializer_class(self):
-        if self.action in permissions.SAFE_METHODS:
+        if self.action == 'cookable':
+            return CookableRecipeSerializer
+        if (
+            self.action in ('list', 'feed')
+            and self.request.query_params.get('variant') == CARD_VARIANT
+        ):
+            return RecipeCardSerializer
+        if self.request.method in permissions.SAFE_METHODS:
             return RecipeListSerializer
         return RecipeCreateUpdateSerializer
 
+    @property
+    def paginator(self):
+        if (
+            not hasattr(self, '_paginator')
+            and self.action in ('list', 'feed')
+            and PubDateCursorPagination.cursor_query_param
+            in self.request.query_params
+        ):
+            self._paginator = PubDateCursorPagination()
+        return super().paginator
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['image_rendition'] = {
+            'list': 'card', 'feed': 'card', 'cookable': 'card',
+            'retrieve': 'detail'
+        }.get(self.action)
+        return context
+
+    def list(self, request, *args, **kwargs):
+        if not cache.is_cacheable(request):
+            return super().list(request, *args, **kwargs)
+        return self.cached_response(
+            cache.list_key(request), super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        view = super().retrieve
+        if not Fieldset.from_request(request):
+            view = partial(self.cached_response,
+                           cache.detail_key(kwargs['pk']), view)
+        return self.conditional_response(view, request, *args, **kwargs)
+
+    def get_etag(self, request, *args, **kwargs):
+        try:
+            state = cache.detail_state(request.user, kwargs['pk']).first()
+        except (TypeError, ValueError):
+            return None
+        if state is None:
+            return None
+        return cache.detail_etag(request.get_full_path(), state)
+
+    def get_cache_control(self, request):
+        return cache.get_cache_control(request.user)
+
+    def cached_response(self, key, view, request, *args, **kwargs):
+        data = cache.get_payload(key)
+        if data is None:
+            response = view(request, *args, **kwargs)
+            cache.set_payload(key, response.data)
+            return response
+        cache.apply_user_flags(data, request.user)
+        return Response(data)
+
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
@@ -41,22 +165,34 @@ class RecipeViewSet(CreateRetrievListPatchDestroyViewSet):
             context={'request': self.request}
         )
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        with transaction.atomic():
+            lock_recipes([pk])
+            serializer.save()
+            change_counter(serializer_class.Meta.model, [pk], 1)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     def action_delete(self, pk, serializer_class):
-        user = self.request.user
         recipe = get_object_or_404(Recipe, pk=pk)
-        model_obj = serializer_class.Meta.model.objects.filter(
-            user=user, recipe=recipe
+        results = remove_relations(
+            serializer_class.Meta.model, self.request.user, [recipe.pk]
         )
-        if self.request.method == 'DELETE':
-            if not model_obj.exists():
-                return Response({'error': 'Рецепта нет в избранном.'},
-                                status=status.HTTP_400_BAD_REQUEST)
-        model_obj.delete()
+        if results[recipe.pk] == 'absent':
+            return Response({'error': 'Рецепта нет в избранном.'},
+                            status=status.HTTP_400_BAD_REQUEST)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    def bulk_action(self, model):
+        serializer = RecipeIdsSerializer(data=self.request.data)
+        serializer.is_valid(raise_exception=True)
+        recipe_ids = serializer.validated_data['recipes']
+        if self.request.method == 'POST':
+            results = add_relations(model, self.request.user, recipe_ids)
+        else:
+            results = remove_relations(model, self.request.user, recipe_ids)
+        return Response({'results': [
+            {'id': pk, 'status': result} for pk, result in results.items()
+        ]})
+
     @action(methods=['POST'], detail=True,
             permission_classes=[permissions.IsAuthenticated])
     def favorite(self, request, pk=None):
@@ -75,32 +211,49 @@ class RecipeViewSet(CreateRetrievListPatchDestroyViewSet):
     def shopping_cart_delete(self, request, pk=None):
         return self.action_delete(pk, ShoppingCartSerializer)
 
+    @action(methods=['POST', 'DELETE'], detail=False,
+            permission_classes=[permissions.IsAuthenticated],
+            url_path='favorite', url_name='favorite-bulk')
+    def favorite_bulk(self, request):
+        return self.bulk_action(FavoriteRecipe)
+
+    @action(methods=['POST', 'DELETE'], detail=False,
+            permission_classes=[permissions.IsAuthenticated],
+            url_path='shopping_cart', url_name='shopping-cart-bulk')
+    def shopping_cart_bulk(self, request):
+        return self.bulk_action(ShoppingCart)
+
+    @action(methods=['DELETE'], detail=False,
+            permission_classes=[permissions.IsAuthenticated])
+    def clear_shopping_cart(self, request):
+        remove_relations(ShoppingCart, request.user)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(methods=['GET'], detail=False,
+            permission_classes=[permissions.IsAuthenticated])
+    def feed(self, request):
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            feed_entries__user=request.user
+        ).order_by('-feed_entries__pub_date', '-feed_entries__recipe')
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(methods=['GET'], detail=False)
+    def cookable(self, request):
+        queryset = rank_by_coverage(
+            self.filter_queryset(self.get_queryset()),
+            get_ingredient_ids(request)
+        )
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
     @action(methods=['GET'], detail=False,
             permission_classes=[permissions.IsAuthenticated],
-            pagination_class=None)
+            pagination_class=None,
+            renderer_classes=shopping_list.RENDERERS)
     def download_shopping_cart(self, request):
-        user = request.user
-        ingredients = IngredientsAmount.objects.filter(
-            recipe__shopcarts__user=user).values(
-                'ingredient__name', 'ingredient__measurement_unit').annotate(
-                    Sum('amount', distinct=True))
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.add_font(
-            'Teddy', '', './recipes/fonts/teddy-bear.ttf', uni=True)
-        pdf.set_font('Teddy', size=14)
-        pdf.cell(txt='Список покупок', center=True)
-        pdf.ln(8)
-        for i, ingredient in enumerate(ingredients):
-            name = ingredient['ingredient__name']
-            unit = ingredient['ingredient__measurement_unit']
-            amount = ingredient['amount__sum']
-            pdf.cell(40, 10, f'{i + 1}) {name} - {amount} {unit}')
-            pdf.ln()
-        file = pdf.output(dest='S')
-        response = HttpResponse(
-            content_type='application/pdf', status=status.HTTP_200_OK)
-        response['Content-Disposition'] = (
-            'attachment; filename="shopping_cart.pdf"')
-        response.write(bytes(file))
-        return response
+        renderer = request.accepted_renderer
+        ingredients = get_shopping_cart_ingredients(request.user)
+        return renderer.attachment(renderer.stream(ingredients))
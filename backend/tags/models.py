@@ -26,6 +26,11 @@ class Tag(models.Model):
         max_length=settings.CONST_LENGTH,
         unique=True
     )
+    updated_at = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True,
+        db_index=True
+    )
 
     class Meta:
         verbose_name = 'Тег'
@@ -1,12 +1,31 @@
 from rest_framework import permissions
 from rest_framework.viewsets import ReadOnlyModelViewSet
 
+from django.conf import settings
+
+from api import snapshots
+from api.conditional import ConditionalGetMixin
+from api.replicas import ReplicaReadMixin
 from .models import Tag
 from .serializers import TagSerializer
 
 
-class TagViewSet(ReadOnlyModelViewSet):
+class TagViewSet(ReplicaReadMixin, ConditionalGetMixin, ReadOnlyModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     pagination_class = None
+    cache_control = {'public': True, 'max_age': settings.DICTIONARY_MAX_AGE}
+
+    def get_etag(self, request, *args, **kwargs):
+        return snapshots.get_etag(request.get_full_path())
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
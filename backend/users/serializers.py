@@ -1,12 +1,15 @@
 from djoser.serializers import UserSerializer
 from rest_framework import serializers
 
+from api.fieldsets import SparseFieldsetMixin
 from .models import CustomUser, Follow
 from recipes.models import Recipe
 from recipes.utils import Base64ImageField
 
+RECIPES_LIMIT = 3
 
-class CustomUserSerializer(UserSerializer):
+
+class CustomUserSerializer(SparseFieldsetMixin, UserSerializer):
     is_subscribed = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
@@ -15,6 +18,8 @@ class CustomUserSerializer(UserSerializer):
                   'first_name', 'last_name', 'is_subscribed')
 
     def get_is_subscribed(self, obj):
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
         user = self.context.get('request').user
         if user.is_anonymous:
             return False
@@ -46,16 +51,25 @@ class FollowSerializer(serializers.ModelSerializer):
         read_only_fields = ['__all__']
 
     def get_is_subscribed(self, obj):
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
         user = self.context.get('request').user
         if user.is_anonymous:
             return False
         return Follow.objects.filter(user=user, author=obj.id).exists()
 
     def get_recipes_count(self, obj):
+        if hasattr(obj, 'recipes_count'):
+            return obj.recipes_count
         return obj.recipes.count()
 
     def get_recipes(self, obj):
-        recipes = obj.recipes.all()[:3]
+        if hasattr(obj, 'recipe_previews'):
+            recipes = obj.recipe_previews
+        else:
+            recipes = obj.recipes.all()[
+                :self.context.get('recipes_limit', RECIPES_LIMIT)
+            ]
         request = self.context.get('request')
         return FollowRecipeImageSerializer(
             recipes, many=True,
@@ -3,25 +3,65 @@ from rest_framework import permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from django.db.models import Count, Exists, OuterRef, Value
 from django.shortcuts import get_object_or_404
 
+from api.fieldsets import Fieldset
+from api.replicas import ReplicaReadMixin
+from recipes.models import Recipe
 from .models import CustomUser, Follow
-from .serializers import CustomUserSerializer, FollowSerializer
+from .serializers import (RECIPES_LIMIT, CustomUserSerializer,
+                          FollowSerializer,)
 
 
-class UsersViewSet(DjoserUserViewSet):
+def get_recipes_limit(request):
+    try:
+        return max(int(request.query_params.get('recipes_limit')), 0)
+    except (TypeError, ValueError):
+        return RECIPES_LIMIT
+
+
+class UsersViewSet(ReplicaReadMixin, DjoserUserViewSet):
     queryset = CustomUser.objects.all()
     serializer_class = CustomUserSerializer
     permission_classes = [permissions.AllowAny]
 
+    def uses_replica(self, request):
+        return super().uses_replica(request) and request.user.is_anonymous
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+        if (
+            self.action in ('list', 'retrieve')
+            and user.is_authenticated
+            and Fieldset.from_request(self.request).keeps('is_subscribed')
+        ):
+            queryset = queryset.annotate(is_subscribed=Exists(
+                Follow.objects.filter(user=user, author=OuterRef('pk'))
+            ))
+        return queryset
+
     @action(methods=['GET'], detail=False,
             permission_classes=[permissions.IsAuthenticated])
     def subscriptions(self, request):
         user = self.request.user
-        authors = CustomUser.objects.filter(followings__user=user)
+        authors = CustomUser.objects.filter(followings__user=user).annotate(
+            recipes_count=Count('recipes'),
+            is_subscribed=Value(True),
+        ).order_by('id')
         page = self.paginate_queryset(authors)
+        recipes_limit = get_recipes_limit(request)
+        previews = {author.id: [] for author in page}
+        if recipes_limit:
+            for recipe in Recipe.objects.latest_by_author(page,
+                                                          recipes_limit):
+                previews[recipe.author_id].append(recipe)
+        for author in page:
+            author.recipe_previews = previews[author.id]
         serializer = FollowSerializer(
-            page, many=True, context={'request': request}
+            page, many=True,
+            context={'request': request, 'recipes_limit': recipes_limit}
         )
         return self.get_paginated_response(serializer.data)
 
@@ -36,7 +76,10 @@ class UsersViewSet(DjoserUserViewSet):
                 {'error': 'Вы подписаны на этого автора'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        serializer = FollowSerializer(author, context={'request': request})
+        serializer = FollowSerializer(author, context={
+            'request': request,
+            'recipes_limit': get_recipes_limit(request),
+        })
         Follow.objects.create(user=user, author=author)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 